@@ -1,4 +1,4 @@
-from .objetos import Medida, Recta, Number, VALOR, ERROR
+from .objetos import Medida, Recta, Rectas, Number, VALOR, ERROR
 from .cargador import cargar
 from .constantes import pi
 
@@ -9,6 +9,10 @@ from . import estadistica
 from . import func
 from . import objetos
 from . import plot
+from . import precision
+from . import expresion
+from . import remuestreo
+from . import cache
 from . import tabla
 from . import calculos
 from . import constantes
@@ -1,21 +1,41 @@
-from .objetos import Medida, Recta
+from .objetos import Medida, Recta, Rectas
 from .type_alias import elementos, Opcional
+from . import cache
+from . import calculos
+from .expresion import Expresion
 import numpy as np
 from scipy.optimize import curve_fit
 from inspect import signature
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import os
+import pickle
 
 
 
-def curva(funcion, x: elementos, y: elementos, sigma = None, initial_guess: list[float] = None, aproximar: bool = False):
+def curva(funcion, x: elementos, y: elementos, sigma = None, initial_guess: list[float] = None, aproximar: bool = False,
+          resultado: bool = False):
     '''Hace un ajuste a una curva arbitraria dada por la funcion pasada como parametro.
     Si no se pasa parametro para sigma el ajuste no tiene pesos, si se pasa un iterable se toman como erroes
-    los valores en el iterable. En otro caso se toman los valores del error de y'''
-    
+    los valores en el iterable. En otro caso se toman los valores del error de y.
+    Con resultado=True devuelve un ResultadoAjuste (covarianza, residuos, chi², R²...) en vez de solo los parámetros'''
+    x, y, sigma, initial_guess = _prepara_curva(funcion, x, y, sigma, initial_guess)
+    popt, error = _curve_fit(funcion, x, y, initial_guess, sigma)
+    parametros = _parametros(popt, error, aproximar)
+    if not resultado:
+        return parametros
+    x, y = _valores(x, ravel=False), _valores(y)
+    return ResultadoAjuste(parametros, error, x, y, np.asarray(funcion(x, *popt), dtype=float),
+                           None if sigma is None else _valores(sigma))
+
+def _prepara_curva(funcion, x, y, sigma, initial_guess):
+    '''Valores, errores y valor inicial de un ajuste de curva tal y como los necesita curve_fit'''
     # Se extraen los valores de las medidas y el valor de los errores en caso valido
     if isinstance(x, Medida):
         x = x._medida
     if isinstance(y, Medida):
-        if sigma == True:
+        if sigma is True:
             sigma = y.error
         y = y._medida
         
@@ -24,55 +44,194 @@ def curva(funcion, x: elementos, y: elementos, sigma = None, initial_guess: list
         initial_guess = (initial_guess, )
     
     # Se comprueba que el número de parámetros sea el correcto
-    if len(signature(funcion).parameters) > 1 and initial_guess is not None and len(initial_guess) != len(signature(funcion).parameters) - 1:
-        raise TypeError(f'La longitud de "initial_guess" debe ser {len(signature(funcion).parameters)} se obtuvieron {len(initial_guess)} parametros')        
-    
-    popt, error = curve_fit(funcion, x, y, p0=initial_guess, sigma = sigma)
-    # Se devuelve una tupla con las medidas obtenidas
-    return tuple((Medida(v, e, aproximar=aproximar) for v, e in zip(popt, np.sqrt(np.diag(error)))))
+    n_parametros = len(funcion) if isinstance(funcion, Modelo) else len(signature(funcion).parameters) - 1
+    if n_parametros > 0 and initial_guess is not None and len(initial_guess) != n_parametros:
+        raise TypeError(f'La longitud de "initial_guess" debe ser {n_parametros} '
+                        f'se obtuvieron {len(initial_guess)} parametros')
+    return x, y, sigma, initial_guess
+
+def _ajusta(funcion, x, y, initial_guess, sigma, absoluto: bool = False):
+    '''
+    curve_fit de una función o de un Modelo (con su jacobiano). Con absoluto=True sigma son errores reales y la
+    covarianza no se reescala con χ²/ν
+    '''
+    if isinstance(funcion, Modelo):
+        return funcion._ajusta(x, y, initial_guess, sigma, absoluto)
+    return curve_fit(funcion, x, y, p0=initial_guess, sigma=sigma, absolute_sigma=absoluto)
+
+def _curve_fit(funcion, x, y, initial_guess, sigma):
+    '''_ajusta pasando por la caché de ajustes si está activada (ver el módulo cache)'''
+    if cache.CACHE is None:
+        return _ajusta(funcion, x, y, initial_guess, sigma)
+    clave = cache.clave('curva', funcion, x, y, sigma, initial_guess)
+    ajuste = cache.busca(clave)
+    if ajuste is None:
+        ajuste = _ajusta(funcion, x, y, initial_guess, sigma)
+        cache.guarda(clave, ajuste)
+    return ajuste
+
+class Modelo:
+    """
+    Función de ajuste f(x, p_0, p_1, ...) preparada para ajustarla muchas veces: su firma se lee una sola vez y se le
+    puede dar el jacobiano, con lo que curve_fit no tiene que aproximar las derivadas evaluando la función una vez
+    más por parámetro. jacobiano puede ser una función jacobiano(x, p_0, p_1, ...) que devuelve la matriz (puntos,
+    parámetros) de derivadas, o 'auto' para calcularlo evaluando la función sobre expresiones perezosas (ver
+    Medida.perezosa), lo que exige que solo use operaciones y funciones de numpy. Se puede usar en lugar de la
+    función en curva, curva_xy, curva_paralela y remuestreo.curva.
+    En el primer ajuste se comprueba que la función esté vectorizada (que devuelva un valor por punto al pasarle
+    un array); si no lo está se evalúa punto a punto con np.vectorize y el jacobiano 'auto' se sustituye por
+    diferencias finitas
+    """
+    def __init__(self, funcion, jacobiano=None):
+        self.funcion = funcion
+        self.parametros = tuple(signature(funcion).parameters)[1:]
+        self.jacobiano = self._jacobiano_auto if jacobiano == 'auto' else jacobiano
+        self.vectorizada = None
+        self._evalua = funcion
+
+    def __call__(self, x, *parametros):
+        return self._evalua(x, *parametros)
+
+    def __len__(self):
+        return len(self.parametros)
+
+    def _jacobiano_auto(self, x, *parametros):
+        medidas = [Medida(p, 0, aproximar=False, backend=calculos.FLOAT64) for p in parametros]
+        resultado = self.funcion(x, *(m.perezosa() for m in medidas))
+        if not isinstance(resultado, Expresion):
+            # La función no depende de los parámetros
+            return np.zeros((np.size(resultado), len(medidas)))
+        return np.column_stack([np.ravel(d) for d in resultado.derivadas(*medidas)])
+
+    def _comprueba(self, x, y, initial_guess):
+        '''Comprueba en el primer ajuste que la función esté vectorizada y que el jacobiano 'auto' se pueda calcular'''
+        try:
+            vectorizada = np.shape(self.funcion(x, *initial_guess)) == np.shape(y)
+        except (TypeError, ValueError):
+            vectorizada = False
+        self.vectorizada = vectorizada
+        if not vectorizada:
+            self._evalua = np.vectorize(self.funcion)
+            if self.jacobiano == self._jacobiano_auto:
+                self.jacobiano = None
+        elif self.jacobiano == self._jacobiano_auto:
+            try:
+                self._jacobiano_auto(x, *initial_guess)
+            except (TypeError, ValueError) as e:
+                raise TypeError(f'No se puede calcular el jacobiano de {self.funcion.__name__} con expresiones '
+                                f'perezosas, usa funciones de numpy o pasa el jacobiano: {e}') from None
+
+    def _ajusta(self, x, y, initial_guess, sigma, absoluto=False):
+        initial_guess = np.ones(len(self)) if initial_guess is None else np.asarray(initial_guess, dtype=float)
+        if self.vectorizada is None:
+            self._comprueba(x, y, initial_guess)
+        return curve_fit(self._evalua, x, y, p0=initial_guess, sigma=sigma, jac=self.jacobiano,
+                         absolute_sigma=absoluto)
+
+    def __repr__(self):
+        return f'Modelo({self.funcion.__name__}({", ".join(("x",) + self.parametros)}))'
+
+def _parametros(popt, pcov, aproximar):
+    '''Tupla con las medidas de los parámetros obtenidos en un ajuste'''
+    return tuple((Medida(v, e, aproximar=aproximar) for v, e in zip(popt, np.sqrt(np.diag(pcov)))))
+
+def curva_paralela(funcion, conjuntos, sigma = None, initial_guess: list[float] = None, aproximar: bool = False,
+                   procesos: int = None, desde_anterior: bool = False) -> list[tuple[Medida, ...]]:
+    '''
+    Ajusta la misma curva a varios conjuntos de datos [(x, y), (x, y, sigma), ...] repartiéndolos entre varios
+    procesos y devuelve, en el mismo orden, lo que devolvería curva para cada uno. sigma se aplica a los conjuntos
+    que no traen el suyo. procesos limita el número de procesos (por defecto uno por núcleo). Si la función no se puede
+    enviar a otro proceso (una lambda, una función local...) se usan hilos. Con desde_anterior cada ajuste empieza en
+    el resultado del conjunto anterior, útil si los parámetros varían poco de un conjunto al siguiente
+    '''
+    datos = []
+    for conjunto in conjuntos:
+        x, y, s, valor_inicial = _prepara_curva(funcion, conjunto[0], conjunto[1],
+                                               conjunto[2] if len(conjunto) > 2 else sigma, initial_guess)
+        datos.append((len(datos), x, y, s))
+    if not datos:
+        return []
+    if cache.CACHE is None or desde_anterior:
+        # Con desde_anterior el resultado de un conjunto depende de los anteriores y no se guarda
+        ajustes = _ajusta_conjuntos(funcion, datos, valor_inicial, procesos, desde_anterior)
+    else:
+        # Solo se reparten entre los procesos los conjuntos que no están en la caché
+        claves = [cache.clave('curva', funcion, x, y, s, valor_inicial) for _, x, y, s in datos]
+        ajustes = [cache.busca(clave) for clave in claves]
+        pendientes = [conjunto for conjunto, ajuste in zip(datos, ajustes) if ajuste is None]
+        if pendientes:
+            for conjunto, ajuste in zip(pendientes, _ajusta_conjuntos(funcion, pendientes, valor_inicial, procesos)):
+                ajustes[conjunto[0]] = ajuste
+                cache.guarda(claves[conjunto[0]], ajuste)
+    return [_parametros(popt, pcov, aproximar) for popt, pcov in ajustes]
+
+def _ajusta_conjuntos(funcion, datos, initial_guess, procesos, desde_anterior=False, tolerante=False):
+    '''
+    Reparte los conjuntos (índice, x, y, sigma) entre procesos (o hilos) y devuelve sus (popt, pcov) en orden.
+    Con tolerante=True un ajuste que falla da None en vez de una excepción
+    '''
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(datos)))
+    if procesos == 1:
+        resultados = [_ajusta_bloque(funcion, datos, initial_guess, desde_anterior, tolerante)]
+    else:
+        # Bloques de conjuntos contiguos. Con desde_anterior uno por proceso, para que cada ajuste salga del de su
+        # vecino; si no, varios por proceso para repartir mejor la carga
+        n_bloques = procesos if desde_anterior else min(len(datos), 4*procesos)
+        bloques = [datos[i[0]:i[-1] + 1] for i in np.array_split(np.arange(len(datos)), n_bloques)]
+        try:
+            pickle.dumps(funcion)
+            Ejecutor = ProcessPoolExecutor
+        except (pickle.PicklingError, AttributeError, TypeError):
+            Ejecutor = ThreadPoolExecutor
+        with Ejecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(_ajusta_bloque, repeat(funcion), bloques, repeat(initial_guess),
+                                           repeat(desde_anterior), repeat(tolerante)))
+    return [ajuste for bloque in resultados for ajuste in bloque]
+
+def _ajusta_bloque(funcion, bloque, initial_guess, desde_anterior, tolerante=False):
+    '''Ajusta en orden los conjuntos (índice, x, y, sigma) de un bloque. Se ejecuta en los procesos de curva_paralela'''
+    resultados = []
+    p0 = initial_guess
+    for i, x, y, sigma in bloque:
+        try:
+            popt, pcov = _ajusta(funcion, x, y, p0, sigma)
+        except (RuntimeError, ValueError) as e:
+            if tolerante:
+                resultados.append(None)
+                continue
+            raise type(e)(f'Falló el ajuste del conjunto {i}: {e}') from None
+        if desde_anterior and np.all(np.isfinite(popt)):
+            p0 = popt
+        resultados.append((popt, pcov))
+    return resultados
 
 def r_curva(funcion, x, y, sigma = None, initial_guess=None, aproximar = False):
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        if hasattr(sigma, '__iter__'):
-            sigma = y.error
-        y = y._medida
-        
-    if initial_guess is not None and len(initial_guess) != len(signature(funcion).parameters) - 1:
-        raise TypeError(f'La longitud de "initial_guess" debe ser {len(signature(funcion).parameters)} se obtuvieron {len(initial_guess)} parametros')    
-    
-    if  len(signature(funcion).parameters) - 1 > 0 and initial_guess is not None and not hasattr(initial_guess, '__iter__'):
-        initial_guess = (initial_guess, )
-    
-    popt, pcov = curve_fit(funcion, x, y)
-    residuals = y- funcion(x, *popt)
-    ss_res = np.sum(residuals**2)
-    ss_tot = np.sum((y-np.mean(y))**2)
-    return np.sqrt(1 - (ss_res / ss_tot))
+    '''Coeficiente de correlación (raíz de R²) del ajuste que haría curva con los mismos argumentos'''
+    return np.sqrt(curva(funcion, x, y, sigma, initial_guess, aproximar, resultado=True).r2)
 
-def minimos_cuadrados(x: elementos, y: elementos, aproximar: bool = False) -> Recta:
+def minimos_cuadrados(x: elementos, y: elementos, aproximar: bool = False, resultado: bool = False) -> Recta:
     """
     Calcula la recta de ajuste por mínimos cuadrados para dos medidas.
+    Con resultado=True devuelve un ResultadoAjuste con la recta en su atributo recta
 
     return tuple(Medida, Medida)
     (pen, n_0)
     pen: pendiente de la recta de ajuste
     n_0: ordenada en el origen de la recta de ajuste
     """
-    p, n = calc_line(x, y)
-    dp, dn = sigma_calc_line(x, y)
-    pen: Medida = Medida(p, dp, aproximar=aproximar)
-    n_0: Medida = Medida(n, dn, aproximar=aproximar)
-    if isinstance(x, Medida):
-        x = x.medida
-    return Recta(pen, n_0, x)
-
-def minimos_pesados(x: Medida, y: Medida, yerr: Opcional[[float, ...]] = None, aproximar: bool = False) -> Recta:
+    e = _estadisticos(x, y)
+    pen: Medida = Medida(e.pendiente(), e.sigma_pendiente(), aproximar=aproximar)
+    n_0: Medida = Medida(e.ordenada(), e.sigma_ordenada(), aproximar=aproximar)
+    recta = Recta(pen, n_0, x.medida if isinstance(x, Medida) else x)
+    return _resultado_recta(recta, e, x, y) if resultado else recta
+
+def minimos_pesados(x: Medida, y: Medida, yerr: Opcional[[float, ...]] = None, aproximar: bool = False,
+                    resultado: bool = False) -> Recta:
     """
     Calcula la recta de ajuste por mínimos cuadrados pesados para dos medidas.
     El error del eje y se extrae de la Medida \"y\" y el error del eje x se
-    desprecia
+    desprecia (minimos_pesados_xy lo tiene en cuenta).
+    Con resultado=True devuelve un ResultadoAjuste con la recta en su atributo recta
     Args: 
         pen: pendiente de la recta de ajuste
         n_0: ordenada en el origen de la recta de ajuste
@@ -80,14 +239,439 @@ def minimos_pesados(x: Medida, y: Medida, yerr: Opcional[[float, ...]] = None, a
     Returns:
         tuple(Medida, Medida): (pendiente, ordenada en el origen)
     """
+    e = _estadisticos(x, y, yerr, pesado=True)
+    pen: Medida = Medida(e.pendiente(), e.sigma_pendiente(), aproximar=aproximar)
+    n_0: Medida = Medida(e.ordenada(), e.sigma_ordenada(), aproximar=aproximar)
+    recta = Recta(pen, n_0, x.medida if isinstance(x, Medida) else x)
+    if not resultado:
+        return recta
+    return _resultado_recta(recta, e, x, y, y._error if yerr is None else yerr)
+
+def _resultado_recta(recta, e, x, y, yerr=None):
+    '''ResultadoAjuste de una recta a partir de los estadísticos con los que se ajustó'''
+    x, y = _valores(x), _valores(y)
+    a, b = recta.pendiente._medida[0], recta.n_0._medida[0]
+    # cov(pendiente, ordenada) = -x̄·σ²(pendiente), ya que la ordenada es ȳ - pendiente·x̄
+    var_a = e.sigma_pendiente()**2
+    cov = -e.x_media*var_a
+    covarianza = np.array([[var_a, cov], [cov, e.sigma_ordenada()**2]], dtype=float)
+    sigma = None if yerr is None else np.broadcast_to(_valores(yerr), y.shape)
+    ajuste = ResultadoAjuste(tuple(recta), covarianza, x, y, float(a)*x + float(b), sigma)
+    ajuste.recta = recta
+    return ajuste
+
+def _valores(valores, ravel=True) -> np.ndarray:
+    '''Array de floats con los valores (de una medida o de un iterable)'''
+    if isinstance(valores, Medida):
+        valores = valores._medida
+    valores = np.asarray(valores, dtype=float)
+    return valores.ravel() if ravel else valores
+
+class ResultadoAjuste:
+    """
+    Resultado completo de un ajuste (curva, minimos_cuadrados o minimos_pesados con resultado=True). Todo se calcula
+    una sola vez al ajustar: parámetros (medidas), matriz de covarianza, modelo evaluado en x, residuos, chi², chi²
+    reducido y R². chi² usa los errores de y si el ajuste es pesado y los residuos sin más si no lo es.
+    Se puede desestructurar igual que la tupla de parámetros
+    """
+    def __init__(self, parametros: tuple, covarianza: np.ndarray, x: np.ndarray, y: np.ndarray, modelo: np.ndarray,
+                 sigma: np.ndarray = None):
+        self.parametros = tuple(parametros)
+        self.covarianza = np.asarray(covarianza)
+        self.x = x
+        self.y = y
+        self.sigma = sigma
+        self.modelo = modelo
+        self.residuos = y - modelo
+        self.grados_libertad = y.size - len(self.parametros)
+        cuadrados = self.residuos**2
+        self.chi2 = float(np.sum(cuadrados if sigma is None else cuadrados/sigma**2))
+        self.chi2_reducido = float(np.float64(self.chi2)/self.grados_libertad)
+        self.r2 = float(1 - np.sum(cuadrados)/np.sum((y - y.mean())**2))
+        self.recta = None
+
+    def __iter__(self):
+        return iter(self.parametros)
+
+    def __getitem__(self, index):
+        return self.parametros[index]
+
+    def __len__(self):
+        return len(self.parametros)
+
+    def __str__(self):
+        parametros = ', '.join(str(p) for p in self.parametros)
+        return f'({parametros}) χ² = {self.chi2:.6g}, χ²/ν = {self.chi2_reducido:.6g}, R² = {self.r2:.6g}'
+
+    def __repr__(self):
+        return f'ResultadoAjuste( {self} )'
+
+def minimos_cuadrados_base(x: elementos, y: elementos, funciones: list = None, grado: int = None, sigma = None,
+                           aproximar: bool = False) -> tuple[tuple[Medida, ...], np.ndarray]:
+    """
+    Ajuste por mínimos cuadrados de un modelo lineal en sus parámetros, y = a_0·f_0(x) + a_1·f_1(x) + ..., con las
+    funciones dadas o con un polinomio del grado dado (los coeficientes van de mayor a menor grado, como en
+    minimos_cuadrados). Se resuelve directamente (SVD), sin valor inicial ni iteraciones.
+    Si se pasa sigma, o y es una medida con errores, el ajuste es pesado y la covarianza sale de esos errores; si no,
+    se estima con la dispersión de los puntos
+
+    Returns:
+        tuple[tuple[Medida, ...], np.ndarray]: (parámetros, matriz de covarianza)
+    """
+    if (funciones is None) == (grado is None):
+        raise TypeError('Hay que pasar las funciones de la base o el grado del polinomio (solo una de las dos)')
+    if isinstance(x, Medida):
+        x = x._medida
+    if isinstance(y, Medida):
+        if sigma is None and np.any(y._error != 0):
+            sigma = y._error
+        y = y._medida
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if grado is not None:
+        diseño = np.vander(x, grado + 1)
+    else:
+        diseño = np.column_stack([np.broadcast_to(np.asarray(f(x), dtype=float), x.shape) for f in funciones])
+    pesado = sigma is not None
+    if pesado:
+        sigma = np.broadcast_to(np.asarray(sigma, dtype=float).ravel(), y.shape)
+        diseño = diseño/sigma[:, np.newaxis]
+        b = y/sigma
+    else:
+        b = y
+    # Se normalizan las columnas para que la SVD no pierda precisión con columnas de escalas muy distintas
+    normas = np.linalg.norm(diseño, axis=0)
+    normas[normas == 0] = 1
+    u, s, vt = np.linalg.svd(diseño/normas, full_matrices=False)
+    inversa = np.where(s > s[0]*max(diseño.shape)*np.finfo(float).eps, 1/s, 0)
+    parametros = vt.T @ (inversa*(u.T @ b)) / normas
+    covarianza = (vt.T*inversa**2) @ vt / np.outer(normas, normas)
+    if not pesado:
+        residuos = y - (diseño @ parametros)
+        covarianza *= residuos @ residuos / (y.size - len(parametros))
+    return tuple(Medida(v, e, aproximar=aproximar) for v, e in zip(parametros, np.sqrt(np.diag(covarianza)))), covarianza
+
+def minimos_cuadrados_lote(x: elementos, y: elementos, mascara: Opcional[elementos] = None,
+                           aproximar: bool = False) -> Rectas:
+    """
+    Ajusta por mínimos cuadrados una recta a cada fila de y (forma (conjuntos, puntos)) a la vez, sin un bucle de
+    Python. x puede tener la misma forma o ser la misma para todas las filas. Con mascara (booleana, de la forma de
+    y) solo se usan los puntos marcados, lo que permite conjuntos con distinto número de puntos
+    """
+    e = _estadisticos(x, y, mascara=mascara, lote=True)
+    return _rectas(e, x, mascara, aproximar)
 
-    p, n = wcalc_line(x=x, y=y, yerr=yerr)
-    dp, dn = wsigma_calc_line(x=x, y=y, yerr=yerr)
-    pen: Medida = Medida(p, dp, aproximar=aproximar)
-    n_0: Medida = Medida(n, dn, aproximar=aproximar)
+def minimos_pesados_lote(x: elementos, y: elementos, yerr: Opcional[elementos] = None,
+                         mascara: Opcional[elementos] = None, aproximar: bool = False) -> Rectas:
+    """
+    Ajusta por mínimos cuadrados pesados una recta a cada fila de y a la vez (ver minimos_cuadrados_lote). Si no se
+    pasa yerr se usa el error de y
+    """
+    e = _estadisticos(x, y, yerr, pesado=True, mascara=mascara, lote=True)
+    return _rectas(e, x, mascara, aproximar)
+
+def _rectas(e, x, mascara, aproximar):
+    pen = Medida._desde_arrays(e.pendiente(), e.sigma_pendiente())
+    n_0 = Medida._desde_arrays(e.ordenada(), e.sigma_ordenada())
+    pen._aproximar = n_0._aproximar = aproximar
     if isinstance(x, Medida):
-        x = x.medida
-    return Recta(pen, n_0, x)
+        x = x._medida
+    x = np.broadcast_to(np.asarray(x, dtype=float), np.shape(pen._medida) + np.shape(x)[-1:])
+    if mascara is not None:
+        mascara = np.broadcast_to(np.asarray(mascara, dtype=bool), x.shape)
+    return Rectas(pen, n_0, x, mascara)
+
+def _errores_xy(x, y, xerr, yerr):
+    '''Valores y errores (de las medidas si no se pasan) de los dos ejes como arrays de floats de la forma de y'''
+    if xerr is None:
+        xerr = x._error if isinstance(x, Medida) else 0
+    if yerr is None:
+        yerr = y._error if isinstance(y, Medida) else 0
+    x, y = _valores(x), _valores(y)
+    xerr = np.broadcast_to(_valores(xerr), y.shape)
+    yerr = np.broadcast_to(_valores(yerr), y.shape)
+    if not np.any(xerr) and not np.any(yerr):
+        raise TypeError('El ajuste con errores en los dos ejes necesita los errores: pasa xerr, yerr o medidas con error')
+    return x, y, xerr, yerr
+
+def minimos_pesados_xy(x: elementos, y: elementos, xerr: Opcional[[float, ...]] = None,
+                       yerr: Opcional[[float, ...]] = None, tolerancia: float = 1e-12, max_iteraciones: int = 100,
+                       aproximar: bool = False, resultado: bool = False) -> Recta:
+    """
+    Recta de mínimos cuadrados pesados teniendo en cuenta los errores de x y de y (método de la varianza efectiva):
+    cada punto pesa 1/(σy² + pendiente²·σx²), y como el peso depende de la pendiente se repite el ajuste pesado
+    hasta que la pendiente cambia menos que tolerancia (relativa). Cada iteración es una pasada vectorizada sobre
+    los puntos. Si no se pasan xerr o yerr se usan los errores de las medidas.
+    Con resultado=True devuelve un ResultadoAjuste cuyo chi² usa la varianza efectiva
+    """
+    valores_x = x
+    x, y, xerr, yerr = _errores_xy(x, y, xerr, yerr)
+    vx, vy = xerr**2, yerr**2
+    # Se empieza por el ajuste sin pesos, que no depende de ningún error
+    e = _Estadisticos(x, y)
+    for _ in range(max_iteraciones):
+        pendiente = e.pendiente()
+        varianza = vy + pendiente**2*vx
+        e = _Estadisticos(x, y, 1/varianza)
+        if abs(e.pendiente() - pendiente) <= tolerancia*abs(e.pendiente()):
+            break
+    else:
+        raise RuntimeError(f'El ajuste no convergió en {max_iteraciones} iteraciones')
+    pen: Medida = Medida(e.pendiente(), e.sigma_pendiente(), aproximar=aproximar)
+    n_0: Medida = Medida(e.ordenada(), e.sigma_ordenada(), aproximar=aproximar)
+    recta = Recta(pen, n_0, valores_x.medida if isinstance(valores_x, Medida) else valores_x)
+    if not resultado:
+        return recta
+    return _resultado_recta(recta, e, x, y, np.sqrt(vy + e.pendiente()**2*vx))
+
+def curva_xy(funcion, x: elementos, y: elementos, xerr: Opcional[[float, ...]] = None,
+             yerr: Opcional[[float, ...]] = None, initial_guess: list[float] = None, tolerancia: float = 1e-4,
+             max_iteraciones: int = 100, aproximar: bool = False, resultado: bool = False):
+    """
+    Ajuste a una curva arbitraria (como curva) teniendo en cuenta los errores de x y de y con la varianza efectiva
+    σ² = σy² + (f'(x)·σx)². La derivada se calcula en todos los puntos a la vez por diferencias centradas y el
+    ajuste se repite, empezando en los parámetros anteriores, hasta que ningún parámetro cambia más que tolerancia
+    veces su error. Si no se pasan xerr o yerr se usan los errores de las medidas. Como en minimos_pesados_xy los
+    errores de los parámetros salen de los errores dados, sin reescalarlos con χ²/ν
+    """
+    _, _, _, initial_guess = _prepara_curva(funcion, x, y, None, initial_guess)
+    x, y, xerr, yerr = _errores_xy(x, y, xerr, yerr)
+    clave = None if cache.CACHE is None else cache.clave('curva_xy', funcion, x, y, xerr, yerr, initial_guess,
+                                                         tolerancia=tolerancia, max_iteraciones=max_iteraciones,
+                                                         absoluto=True)
+    ajuste = cache.busca(clave)
+    if ajuste is None:
+        ajuste = _varianza_efectiva(funcion, x, y, xerr, yerr, initial_guess, tolerancia, max_iteraciones)
+        cache.guarda(clave, ajuste)
+    popt, pcov, sigma = ajuste
+    parametros = _parametros(popt, pcov, aproximar)
+    if not resultado:
+        return parametros
+    return ResultadoAjuste(parametros, pcov, x, y, np.asarray(funcion(x, *popt), dtype=float), sigma)
+
+def _varianza_efectiva(funcion, x, y, xerr, yerr, initial_guess, tolerancia, max_iteraciones):
+    '''Iteraciones de curva_xy. Devuelve (popt, pcov, sigma efectiva)'''
+    vx, vy = xerr**2, yerr**2
+    # Paso de la derivada: óptimo para diferencias centradas, relativo a la escala de x
+    h = np.cbrt(np.finfo(float).eps)*np.maximum(np.abs(x), 1)
+    sigma = yerr if np.all(yerr > 0) else None
+    popt, pcov = _ajusta(funcion, x, y, initial_guess, sigma)
+    for _ in range(max_iteraciones):
+        derivada = (np.asarray(funcion(x + h, *popt), dtype=float)
+                    - np.asarray(funcion(x - h, *popt), dtype=float))/(2*h)
+        sigma = np.sqrt(vy + derivada**2*vx)
+        anterior = popt
+        # La varianza efectiva son errores reales, como en minimos_pesados_xy: la covarianza no se reescala
+        popt, pcov = _ajusta(funcion, x, y, anterior, sigma, absoluto=True)
+        if np.all(np.abs(popt - anterior) <= tolerancia*np.sqrt(np.diag(pcov))):
+            return popt, pcov, sigma
+    raise RuntimeError(f'El ajuste no convergió en {max_iteraciones} iteraciones')
+
+class _Estadisticos:
+    """
+    Estadísticos suficientes de un ajuste lineal, pesado o no: suma de pesos, medias y sumas de productos centradas.
+    Se calculan una sola vez y de ellos salen la recta, sus errores y R². Las sumas se hacen restando el primer
+    punto a los datos para no perder cifras cuando los valores son grandes comparados con su dispersión
+    """
+    def __init__(self, x: np.ndarray, y: np.ndarray, w: np.ndarray = None, mascara: np.ndarray = None):
+        # Los puntos están en el último eje: con arrays 2D se obtienen los estadísticos de cada fila (un ajuste
+        # por fila). Los puntos fuera de la máscara no cuentan
+        self.pesado = w is not None
+        if mascara is None:
+            self.n = x.shape[-1]
+            x0, y0 = x[..., :1], y[..., :1]
+            dx, dy = x - x0, y - y0
+        else:
+            self.n = mascara.sum(axis=-1)
+            primero = mascara.argmax(axis=-1)[..., None]
+            x0, y0 = np.take_along_axis(x, primero, -1), np.take_along_axis(y, primero, -1)
+            dx, dy = np.where(mascara, x - x0, 0), np.where(mascara, y - y0, 0)
+            w = mascara.astype(float) if w is None else np.where(mascara, w, 0)
+        if w is None:
+            s, sx, sy = np.float64(self.n), dx.sum(axis=-1), dy.sum(axis=-1)
+            sxx, sxy, syy = (np.einsum('...i,...i->...', a, b) for a, b in ((dx, dx), (dx, dy), (dy, dy)))
+        else:
+            wdx, wdy = w*dx, w*dy
+            s, sx, sy = w.sum(axis=-1), wdx.sum(axis=-1), wdy.sum(axis=-1)
+            sxx, sxy, syy = (np.einsum('...i,...i->...', a, b) for a, b in ((wdx, dx), (wdx, dy), (wdy, dy)))
+        self.s = s
+        self.x_media = x0[..., 0] + sx/s
+        self.y_media = y0[..., 0] + sy/s
+        self.cxx = sxx - sx*sx/s
+        self.cxy = sxy - sx*sy/s
+        self.cyy = syy - sy*sy/s
+
+    @classmethod
+    def _vacio(cls):
+        '''Estadísticos de un ajuste pesado sin puntos, para ir añadiéndolos con _suma y _combina. Se guardan como
+        np.float64 para que un ajuste imposible dé nan como el resto de funciones en vez de una excepción'''
+        e = object.__new__(cls)
+        e.n, e.pesado = 0, True
+        e.s = e.x_media = e.y_media = e.cxx = e.cxy = e.cyy = np.float64(0)
+        return e
+
+    def _suma(self, x: float, y: float, w: float, n: int = 1):
+        '''
+        Añade un punto de peso w (n = 1) o lo quita (w negativo y n = -1) con la actualización de West, que no resta
+        sumas grandes entre sí
+        '''
+        self.n += n
+        if self.n == 0:
+            self.s = self.x_media = self.y_media = self.cxx = self.cxy = self.cyy = np.float64(0)
+            return
+        self.s += w
+        dx = x - self.x_media
+        dy = y - self.y_media
+        self.x_media += w/self.s*dx
+        self.y_media += w/self.s*dy
+        self.cxx += w*dx*(x - self.x_media)
+        self.cxy += w*dx*(y - self.y_media)
+        self.cyy += w*dy*(y - self.y_media)
+
+    def _combina(self, otro):
+        '''Añade los puntos de otros estadísticos (fórmula de Chan para unir dos grupos)'''
+        if otro.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.s = otro.n, otro.s
+            self.x_media, self.y_media = otro.x_media, otro.y_media
+            self.cxx, self.cxy, self.cyy = otro.cxx, otro.cxy, otro.cyy
+            return
+        s = self.s + otro.s
+        dx = otro.x_media - self.x_media
+        dy = otro.y_media - self.y_media
+        f = self.s*otro.s/s
+        self.cxx += otro.cxx + f*dx*dx
+        self.cxy += otro.cxy + f*dx*dy
+        self.cyy += otro.cyy + f*dy*dy
+        self.x_media += otro.s/s*dx
+        self.y_media += otro.s/s*dy
+        self.n += otro.n
+        self.s = s
+
+    def pendiente(self) -> np.ndarray:
+        return self.cxy/self.cxx
+
+    def ordenada(self) -> np.ndarray:
+        return self.y_media - self.cxy/self.cxx*self.x_media
+
+    def sigma_y(self) -> np.ndarray:
+        """Desviación estándar de los puntos a la recta (suma de residuos al cuadrado = Cyy - pendiente·Cxy)"""
+        residuos = np.maximum(self.cyy - self.cxy*self.cxy/self.cxx, 0)
+        return np.sqrt(residuos/np.float64(self.n - 2))
+
+    def sigma_pendiente(self) -> np.ndarray:
+        if self.pesado:
+            return np.sqrt(1/self.cxx)
+        return self.sigma_y()/np.sqrt(self.cxx)
+
+    def sigma_ordenada(self) -> np.ndarray:
+        raiz = np.sqrt(1/self.s + self.x_media**2/self.cxx)
+        return raiz if self.pesado else self.sigma_y()*raiz
+
+    def r_cuadrado(self) -> np.ndarray:
+        return self.cxy*self.cxy/(self.cxx*self.cyy)
+
+def _estadisticos(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None, pesado: bool = False,
+                  mascara: Opcional[elementos] = None, lote: bool = False) -> _Estadisticos:
+    """
+    Extrae los valores (y en el ajuste pesado los errores de y si no se pasa yerr) y calcula sus estadísticos.
+    Con lote=True cada fila es un conjunto de puntos distinto y x y yerr se extienden a la forma de y
+    """
+    if isinstance(x, Medida):
+        x = x._medida
+    if isinstance(y, Medida):
+        if pesado and yerr is None:
+            yerr = y._error
+        y = y._medida
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    if lote:
+        x = np.broadcast_to(x, y.shape)
+    else:
+        x, y = x.ravel(), y.ravel()
+    if mascara is not None:
+        mascara = np.broadcast_to(np.asarray(mascara, dtype=bool), y.shape)
+    if not pesado:
+        return _Estadisticos(x, y, mascara=mascara)
+    if yerr is None:
+        raise TypeError('El ajuste pesado necesita los errores de y: pasa yerr o una Medida como y')
+    yerr = np.asarray(yerr, dtype=float)
+    w = 1/np.broadcast_to(yerr if lote else yerr.ravel(), y.shape)**2
+    return _Estadisticos(x, y, w, mascara)
+
+class AjusteIncremental:
+    """
+    Ajuste por mínimos cuadrados pesados que se actualiza al añadir o quitar puntos sin volver a recorrer los datos:
+    guarda los estadísticos del ajuste (ver _Estadisticos) y cada punto los cambia en O(1). Con ventana=n solo se
+    ajustan los n últimos puntos y al añadir uno nuevo se quita el más antiguo. recta() devuelve el ajuste actual,
+    el mismo que daría minimos_pesados con esos puntos
+    """
+    def __init__(self, ventana: int = None, aproximar: bool = False):
+        self.ventana = ventana
+        self.aproximar = aproximar
+        self._e = _Estadisticos._vacio()
+        # Con ventana se guardan sus puntos (x, y, peso) para poder quitarlos
+        self._puntos = deque() if ventana is not None else None
+        self._quitados = 0
+
+    def add(self, x, y, yerr: Opcional[[float, ...]] = None):
+        """Añade uno o varios puntos. Si y es una medida y no se pasa yerr se usa su error"""
+        if not isinstance(x, Medida) and not isinstance(y, Medida) and np.ndim(x) == 0:
+            if yerr is None:
+                raise TypeError('El ajuste pesado necesita los errores de y: pasa yerr o una Medida como y')
+            x, y, w = float(x), float(y), 1/float(yerr)**2
+            self._e._suma(x, y, w)
+            if self._puntos is not None:
+                self._puntos.append((x, y, w))
+        else:
+            e = _estadisticos(x, y, yerr, pesado=True)
+            if self._puntos is not None:
+                errores = yerr if yerr is not None else y._error
+                x = x._medida if isinstance(x, Medida) else x
+                y = y._medida if isinstance(y, Medida) else y
+                w = np.broadcast_to(1/np.asarray(errores, dtype=float)**2, np.shape(x))
+                self._puntos.extend(zip(np.ravel(x).astype(float).tolist(), np.ravel(y).astype(float).tolist(),
+                                        np.ravel(w).tolist()))
+            self._e._combina(e)
+        if self._puntos is not None:
+            while len(self._puntos) > self.ventana:
+                self._quita(*self._puntos.popleft())
+        return self
+
+    def remove(self, x: float, y: float, yerr: float):
+        """Quita un punto añadido antes. Con ventana el punto se busca en ella (O(ventana))"""
+        x, y, w = float(x), float(y), 1/float(yerr)**2
+        if self._puntos is not None:
+            try:
+                self._puntos.remove((x, y, w))
+            except ValueError:
+                raise ValueError(f'El punto ({x}, {y}) no está en la ventana') from None
+        self._quita(x, y, w)
+        return self
+
+    def _quita(self, x, y, w):
+        self._e._suma(x, y, -w, -1)
+        # Cada vez que sale una ventana entera se recalcula desde los puntos guardados para no acumular redondeos
+        self._quitados += 1
+        if self._puntos and self._quitados >= self.ventana:
+            self._quitados = 0
+            x, y, w = (np.array(i) for i in zip(*self._puntos))
+            self._e = _Estadisticos._vacio()
+            self._e._combina(_Estadisticos(x, y, w))
+
+    def __len__(self):
+        return self._e.n
+
+    def recta(self) -> Recta:
+        """Recta ajustada a los puntos actuales"""
+        if self._e.n < 2:
+            raise ValueError('Hacen falta al menos dos puntos para ajustar una recta')
+        e = self._e
+        pen: Medida = Medida(e.pendiente(), e.sigma_pendiente(), aproximar=self.aproximar)
+        n_0: Medida = Medida(e.ordenada(), e.sigma_ordenada(), aproximar=self.aproximar)
+        x = [p[0] for p in self._puntos] if self._puntos is not None else []
+        return Recta(pen, n_0, x)
 
 def line(x: elementos , pen: float, n_0: float=0) -> list[float]:
     """Dados una pendiente, una ordenada en el orígen y un rango de valores del eje x crea una línea evaluandola en los puntos de x
@@ -116,33 +700,21 @@ def line(x: elementos , pen: float, n_0: float=0) -> list[float]:
 
 def calc_line(x: elementos, y: elementos) -> tuple[float, float]:
     """Dadas 2 listas con los valores x e y de un conjunto de puntos devuelve el ajuste por mínimos cuadrados de esta"""
-    return pen(x, y), n_0(x, y)
+    e = _estadisticos(x, y)
+    return float(e.pendiente()), float(e.ordenada())
 
 def sigma_calc_line(x: float, y: float) -> tuple[float, float]:
     """Dadas 2 listas con los valores x e y de un conjunto de puntos devuelve los errores de la pendiente y la ordenada en el origen"""
-    return sigma_pen(x, y), sigma_n_0(x, y)
+    e = _estadisticos(x, y)
+    return float(e.sigma_pendiente()), float(e.sigma_ordenada())
 
 def pen(x : elementos, y : elementos) -> float:
     """Calcula la pendiente de la recta de ajuste"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-
-    return float((x.size*np.sum(x*y) - np.sum(x)*np.sum(y))/(x.size*np.sum(x**2) - np.sum(x)**2))
+    return float(_estadisticos(x, y).pendiente())
 
 def n_0 (x : elementos, y : elementos) -> float:
     """Calcula la ordenada en el origen de la recta de ajuste"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-
-    return float((np.sum(y)*np.sum(x**2) - np.sum(x)*np.sum(x*y))/(x.size * np.sum(x**2) - (np.sum(x))**2))
+    return float(_estadisticos(x, y).ordenada())
 
 def sigma_y(x : elementos, y : elementos) -> float:
     """Calcula la desviación estandar de los valores experimentales a su recta de ajuste por mínimos cuadrados
@@ -154,15 +726,7 @@ def sigma_y(x : elementos, y : elementos) -> float:
     Returns:
         float: desviación estandar de la recta
     """
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-
-    ŷ = line(x=x, pen=pen(x, y), n_0=n_0(x, y))
-    return float(np.sqrt( (np.sum( (y-ŷ)**2 ) ) / (x.size - 2)))
+    return float(_estadisticos(x, y).sigma_y())
 
 def sigma_pen(x: elementos, y: elementos) -> float:
     """Calcula la desviación estandar de la pendiente de un ajuste por mínimos cuadrados
@@ -174,14 +738,7 @@ def sigma_pen(x: elementos, y: elementos) -> float:
     Returns:
         float: Desviación estandar de la pendiente
     """
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-
-    return float(sigma_y(x, y) *np.sqrt( x.size / (x.size * np.sum(x**2) - np.sum(x)**2) ))
+    return float(_estadisticos(x, y).sigma_pendiente())
 
 def sigma_n_0(x: elementos, y: elementos) -> float:
     """Calcula la desviación estandar de la ordenada en el origen de un ajuste por mínimos cuadrados
@@ -193,13 +750,11 @@ def sigma_n_0(x: elementos, y: elementos) -> float:
     Returns:
         float: Desviación estandar de la ordenada en el origen
     """
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-    return float(sigma_y(x, y) * np.sqrt( np.sum(x**2) / (x.size * np.sum(x**2) - np.sum(x)**2) ))
+    return float(_estadisticos(x, y).sigma_ordenada())
+
+def r_cuadrado(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None, pesado: bool = False) -> float:
+    """Coeficiente de determinación R² de la recta de ajuste por mínimos cuadrados (pesados si pesado=True)"""
+    return float(_estadisticos(x, y, yerr, pesado).r_cuadrado())
 
 
 def wcalc_line(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None) -> tuple[float, float]:
@@ -213,7 +768,8 @@ def wcalc_line(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None)
     Returns:
         tuple[float, float]: pajera pendinete-ordenada en el origen de los valores obtenidos
     """
-    return wpen(x, y, yerr), wn_0(x, y, yerr)
+    e = _estadisticos(x, y, yerr, pesado=True)
+    return float(e.pendiente()), float(e.ordenada())
 
 def wsigma_calc_line(x: elementos, y: elementos, yerr: Opcional[[float, ...]]) -> float:
     """Calcula los errores estandard del ajuste por mínimos cuadrados pesados
@@ -226,71 +782,24 @@ def wsigma_calc_line(x: elementos, y: elementos, yerr: Opcional[[float, ...]]) -
     Returns:
         tuple[float, float]: pajera error de la pendinete-ordenada en el origen de los valores obtenidos (sigma pen, sigma n_0)
     """
-    return wsigma_pen(x, y, yerr), wsigma_n_0(x, y, yerr)
+    e = _estadisticos(x, y, yerr, pesado=True)
+    return float(e.sigma_pendiente()), float(e.sigma_ordenada())
 
 def wpen(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None) -> float:
     """Calcula la pendiente por un ajuste por mínimos cuadrados pesados"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        if yerr == None:
-            yerr = y._error
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-    yerr = yerr if type(yerr) == type(np.array) else yerr * np.ones(x.size)
-
-    w = 1/yerr**2
-
-    return float((np.sum(w)*np.sum(w*x*y) - np.sum(w*x)*np.sum(w*y)) / (np.sum(w) * np.sum(w*x**2) - np.sum(w*x)**2))
+    return float(_estadisticos(x, y, yerr, pesado=True).pendiente())
 
 def wn_0(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None) -> float:
     """Calcula la ordenada en el orígen por un ajuste por mínimos cuadrados pesados"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        if yerr == None:
-            yerr = y._error
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-    yerr = yerr if type(yerr) == type(np.array) else yerr * np.ones(x.size)
-
-    w = 1/yerr**2
-
-    return float(( np.sum(w*y) * np.sum(w*x**2) - np.sum(w*x) * np.sum(w*x*y)) / (np.sum(w) * np.sum(w * x**2) - np.sum(w*x)**2))
+    return float(_estadisticos(x, y, yerr, pesado=True).ordenada())
 
 def wsigma_pen(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None) -> float:
     """Calcula el error estandar en la ordenada en el orígen del ajuste por mínimos pesados"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        if yerr == None:
-            yerr = y._error
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-    yerr = yerr if type(yerr) == type(np.array) else yerr * np.ones(x.size)
-
-    w = 1/yerr**2
-
-    return float(np.sqrt(np.sum(w) / ( np.sum(w) * np.sum(w*x**2) - np.sum(w*x)**2 ) ))
+    return float(_estadisticos(x, y, yerr, pesado=True).sigma_pendiente())
 
 def wsigma_n_0(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None) -> float:
     """Calcula el error estandar en la ordenada en el orígen del ajuste por mínimos pesados"""
-    if isinstance(x, Medida):
-        x = x._medida
-    if isinstance(y, Medida):
-        if yerr == None:
-            yerr = y._error
-        y = y._medida
-    x = x if type(x) == type(np.array) else np.array(x)
-    y = y if type(y) == type(np.array) else np.array(y)
-    yerr = yerr if type(yerr) == type(np.array) else yerr * np.ones(x.size)
-
-    w = 1/yerr**2
-
-    return float(np.sqrt( np.sum(w*x**2) / (np.sum(w) * np.sum(w*x**2) - np.sum(w*x)**2) ))
+    return float(_estadisticos(x, y, yerr, pesado=True).sigma_ordenada())
 
 
 def compativility(a, da, b, db, nameA = 'A', nameB = 'B'):
@@ -78,6 +78,39 @@ def apr(valor: float, error: float) -> tuple[float, float]:
             cifras_error += 1
     return (calculos.round(valor, cifras_error), calculos.round(error, cifras_error))
 
+def apr_array(valor: np.ndarray, error: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Versión vectorizada de apr para arrays de floats. Aproxima todas las parejas a la vez y da exactamente
+    el mismo resultado que aplicar apr a cada una
+
+    Args:
+        valor (np.ndarray): valores a aproximar
+        error (np.ndarray): errores de las medidas
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (valores, errores) aproximados
+    """
+    valor, error = np.broadcast_arrays(np.asarray(valor, dtype=float), np.asarray(error, dtype=float))
+    valor = valor.copy()
+    error = error.copy()
+    # Los errores nulos y nan dejan la pareja como está y los infinitos ponen el valor a 0 (salvo si es nan)
+    valor[np.isinf(error) & ~np.isnan(valor)] = 0
+    validos = np.isfinite(error) & (error != 0)
+    v = valor[validos]
+    e = error[validos]
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        cifras_error = -np.floor(np.log10(np.abs(e)))
+        stepper = calculos._potencia_10(cifras_error)
+        a = np.trunc(stepper*e)/stepper
+        # Si la primera cifra significativa es un 1 y al aproximar a ella el resultado es 1 se coge también la siguiente
+        primera_es_1 = np.log10(a) == np.floor(np.log10(a))
+        siguiente = calculos.round(e, cifras_error) < 2*calculos._potencia_10(-cifras_error)
+        cifras_error = cifras_error + (primera_es_1 & siguiente)
+
+        valor[validos] = calculos.round(v, cifras_error)
+        error[validos] = calculos.round(e, cifras_error)
+    return (valor, error)
+
 def apr_list(valor: list[float], error: list[float]) -> tuple[list[float], list[float]]:
     """Aplica apr a una lista de valores y errores"""
     if not isinstance(valor, np.ndarray):
@@ -85,14 +118,18 @@ def apr_list(valor: list[float], error: list[float]) -> tuple[list[float], list[
     # Si error es un escalar se transforma en una lista de la misma longitud que valor
     if not hasattr(error, '__iter__'):
         error = np.array(error + 0*valor)
+    # Sin precisión múltiple se aproxima todo a la vez
+    if valor.dtype != object and np.asarray(error).dtype != object:
+        return apr_array(valor, error)
+    valor, error = np.broadcast_arrays(valor, np.asarray(error))
     vallist = []
     errlist = []
-    for i in zip(valor, error):
+    for i in zip(valor.ravel(), error.ravel()):
         v, e = apr(*i)
         vallist.append(v)
         errlist.append(e)
-    vallist = np.array(vallist)
-    errlist = np.array(errlist)
+    vallist = np.array(vallist).reshape(valor.shape)
+    errlist = np.array(errlist).reshape(valor.shape)
     return (vallist, errlist)
 
 # rip monstruosidad de función de aproximación larga vida a apr con logaritmos
@@ -0,0 +1,46 @@
+'''
+Pruebas de rendimiento de pysics. Se ejecutan con python -m pysics.benchmark
+'''
+from timeit import timeit
+import numpy as np
+from .objetos import Medida
+from .precision import ArrayMP
+from . import calculos
+
+
+def _tiempo(funcion, repeticiones: int = 1000) -> float:
+    """Tiempo medio en segundos de una llamada a funcion"""
+    return timeit(funcion, number=repeticiones)/repeticiones
+
+def slicing(tamaños: list[int] = (10**3, 10**4, 10**5, 10**6, 10**7)):
+    """Compara el tiempo de sacar un slice de una medida (una vista, debe ser constante) con el de copiarla (O(n))"""
+    print(f'{"n":>10} {"m[1:-1] (µs)":>14} {"m[::2] (µs)":>14} {"copy() (µs)":>14}')
+    for n in tamaños:
+        m = Medida(np.random.rand(n), 0.01, aproximar=False)
+        t_slice = _tiempo(lambda: m[1:-1])
+        t_paso = _tiempo(lambda: m[::2])
+        t_copia = _tiempo(lambda: m.copy(), repeticiones=10)
+        print(f'{n:>10} {t_slice*1e6:>14.2f} {t_paso*1e6:>14.2f} {t_copia*1e6:>14.2f}')
+
+def precision_multiple(n: int = 10**4):
+    """Compara las operaciones de precisión múltiple elemento a elemento (métodos de Number) con las del módulo
+    precision (todo el array a la vez) y con float64"""
+    a = Medida(np.random.rand(n) + 1, 0.01, aproximar=False, backend=calculos.MULTIPRECISION)
+    b = Medida(np.random.rand(n) + 1, 0.02, aproximar=False, backend=calculos.MULTIPRECISION)
+    fa, fb = a.copy().cambia_backend(calculos.FLOAT64), b.copy().cambia_backend(calculos.FLOAT64)
+    operaciones = {'a*b': np.multiply, 'a+b': np.add, 'a/b': np.true_divide, 'sin(a)': np.sin, 'sqrt(a)': np.sqrt}
+    print(f'{"n = " + str(n):>10} {"Number (ms)":>14} {"precision (ms)":>14} {"float64 (ms)":>14}')
+    for nombre, ufunc in operaciones.items():
+        # Solo los valores, sin propagar errores
+        numbers = [i._medida for i in (a, b)[:ufunc.nin]]
+        arrays_mp = [i.view(ArrayMP) for i in numbers]
+        floats = [i._medida for i in (fa, fb)[:ufunc.nin]]
+        t_number = _tiempo(lambda: ufunc(*numbers), repeticiones=1)
+        t_mp = _tiempo(lambda: ufunc(*arrays_mp), repeticiones=1)
+        t_float = _tiempo(lambda: ufunc(*floats), repeticiones=100)
+        print(f'{nombre:>10} {t_number*1e3:>14.2f} {t_mp*1e3:>14.2f} {t_float*1e3:>14.4f}')
+
+
+if __name__ == '__main__':
+    slicing()
+    precision_multiple()
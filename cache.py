@@ -0,0 +1,198 @@
+'''
+Caché de los resultados de los ajustes de curvas (ajuste.curva, curva_xy y curva_paralela). Está desactivada por
+defecto y se activa con activa(). La clave de cada ajuste es un hash del contenido de x, y, los errores, el valor
+inicial y el código de la función (no su nombre) con los valores de las variables globales que usa, por lo que al
+volver a ejecutar un script los ajustes cuyos datos y modelo no han cambiado no se repiten. Los resultados se guardan
+en memoria (los maximo más recientes) y, si se pasa un directorio, también en disco para que duren entre
+ejecuciones; si el directorio ocupa más de tamaño_maximo bytes se borran los resultados usados hace más tiempo
+'''
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import tempfile
+import types
+import numpy as np
+
+_EXTENSION = '.ajuste'
+
+
+class Cache:
+    """Caché LRU en memoria, y opcionalmente en disco, de resultados de ajustes indexados por su clave"""
+    def __init__(self, maximo: int = 256, directorio: str = None, tamaño_maximo: int = 2**28):
+        self.maximo = maximo
+        self.directorio = directorio
+        self.tamaño_maximo = tamaño_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self._memoria = OrderedDict()
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + _EXTENSION)
+
+    def busca(self, clave: str):
+        """Resultado guardado con la clave o None si no está"""
+        if clave in self._memoria:
+            self._memoria.move_to_end(clave)
+            self.aciertos += 1
+            return self._memoria[clave]
+        if self.directorio is not None:
+            ruta = self._ruta(clave)
+            try:
+                with open(ruta, 'rb') as archivo:
+                    valor = pickle.load(archivo)
+                # La fecha de modificación marca el último uso para el borrado de los más antiguos
+                os.utime(ruta)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._en_memoria(clave, valor)
+                self.aciertos += 1
+                return valor
+        self.fallos += 1
+        return None
+
+    def guarda(self, clave: str, valor):
+        self._en_memoria(clave, valor)
+        if self.directorio is None:
+            return
+        # Se escribe en un archivo temporal y se renombra para que otro proceso nunca lea un archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio)
+        with os.fdopen(descriptor, 'wb') as archivo:
+            pickle.dump(valor, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self._ruta(clave))
+        self._recorta()
+
+    def _en_memoria(self, clave, valor):
+        self._memoria[clave] = valor
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.maximo:
+            self._memoria.popitem(last=False)
+
+    def _recorta(self):
+        '''Borra los archivos usados hace más tiempo hasta que el directorio ocupa como mucho tamaño_maximo'''
+        archivos = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(_EXTENSION):
+                datos = entrada.stat()
+                archivos.append((datos.st_mtime, datos.st_size, entrada.path))
+        total = sum(tamaño for _, tamaño, _ in archivos)
+        for _, tamaño, ruta in sorted(archivos):
+            if total <= self.tamaño_maximo:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            total -= tamaño
+
+    def limpia(self):
+        """Borra todos los resultados, en memoria y en disco"""
+        self._memoria.clear()
+        if self.directorio is not None:
+            for entrada in os.scandir(self.directorio):
+                if entrada.name.endswith(_EXTENSION):
+                    os.remove(entrada.path)
+
+
+CACHE = None
+
+def activa(maximo: int = 256, directorio: str = None, tamaño_maximo: int = 2**28) -> Cache:
+    """
+    Activa la caché de ajustes con hasta maximo resultados en memoria. Con directorio los resultados también se
+    guardan en disco, ocupando como mucho tamaño_maximo bytes
+    """
+    global CACHE
+    CACHE = Cache(maximo, directorio, tamaño_maximo)
+    return CACHE
+
+def desactiva():
+    global CACHE
+    CACHE = None
+
+def _añade_valor(h, valor, vistas):
+    '''Añade al hash una variable que usa la función: otras funciones por su código y el resto por su pickle'''
+    if isinstance(valor, types.ModuleType):
+        # Los módulos (np, math...) no cambian entre ejecuciones, solo cuenta el nombre con el que se usan
+        return
+    if isinstance(getattr(valor, '__code__', None), types.CodeType):
+        _añade_funcion(h, valor, vistas)
+    else:
+        h.update(pickle.dumps(valor))
+
+def _añade_funcion(h, funcion, vistas=None):
+    '''
+    Añade al hash el código de la función, sus valores por defecto, las variables que captura y el valor de las
+    variables globales que usa (constantes del módulo y, recursivamente, las funciones a las que llama)
+    '''
+    # Un ajuste.Modelo se identifica por su función
+    funcion = getattr(funcion, 'funcion', funcion)
+    codigo = getattr(funcion, '__code__', None)
+    if codigo is None:
+        # Objetos llamables que no son funciones de Python (ufuncs, instancias...): se usa su pickle
+        h.update(pickle.dumps(funcion))
+        return
+    # Cada función se añade una vez, para que las funciones recursivas no den vueltas sin fin
+    vistas = set() if vistas is None else vistas
+    if id(funcion) in vistas:
+        h.update(b'recursiva')
+        return
+    vistas.add(id(funcion))
+    globales = getattr(funcion, '__globals__', {})
+    pendientes = [codigo]
+    while pendientes:
+        # Se incluyen las funciones y lambdas definidas dentro de la función (están en sus constantes)
+        codigo = pendientes.pop()
+        h.update(codigo.co_code)
+        h.update(repr(codigo.co_names).encode())
+        for constante in codigo.co_consts:
+            if hasattr(constante, 'co_code'):
+                pendientes.append(constante)
+            else:
+                h.update(repr(constante).encode())
+        # co_names también tiene atributos (el exp de np.exp) y funciones integradas, que no están en los globales
+        for nombre in codigo.co_names:
+            if nombre in globales:
+                h.update(nombre.encode())
+                _añade_valor(h, globales[nombre], vistas)
+    h.update(repr(funcion.__defaults__).encode())
+    for celda in funcion.__closure__ or ():
+        _añade_valor(h, celda.cell_contents, vistas)
+
+def _añade_array(h, valores):
+    if valores is None:
+        h.update(b'None')
+        return
+    valores = np.ascontiguousarray(valores, dtype=float)
+    h.update(repr(valores.shape).encode())
+    h.update(valores.tobytes())
+
+def clave(tipo: str, funcion, *arrays, **opciones) -> str:
+    """
+    Clave de un ajuste: hash del tipo de ajuste, el código de la función, el contenido de los arrays (x, y, errores,
+    valor inicial...) y el resto de opciones. El valor de las variables globales que usa la función forma parte de
+    la clave, por lo que cambiar una constante del módulo o una función auxiliar cambia la clave. Devuelve None si
+    algo no se puede convertir (por ejemplo una función que usa objetos que no se pueden serializar), en cuyo caso
+    el ajuste no se guarda
+    """
+    h = hashlib.blake2b(tipo.encode(), digest_size=20)
+    try:
+        _añade_funcion(h, funcion)
+        for valores in arrays:
+            _añade_array(h, valores)
+    except (TypeError, ValueError, AttributeError, pickle.PicklingError):
+        return None
+    h.update(repr(sorted(opciones.items())).encode())
+    return h.hexdigest()
+
+def busca(clave: str):
+    """Resultado guardado con la clave, o None si no está o la caché está desactivada"""
+    if CACHE is None or clave is None:
+        return None
+    return CACHE.busca(clave)
+
+def guarda(clave: str, valor):
+    if CACHE is not None and clave is not None:
+        CACHE.guarda(clave, valor)
@@ -1,5 +1,5 @@
 from mpmath import mp
-from numpy import floor, ceil
+from numpy import floor, ceil, array, ndarray, float64, errstate
 
 mp.dps = 60
 
@@ -8,14 +8,34 @@ ROUND_DOWN = 2
 
 ROUND_MODE = ROUND_DOWN
 
+# Tipos de almacenamiento de las medidas
+FLOAT64 = 1
+MULTIPRECISION = 2
+
+BACKEND = FLOAT64
+
 
 def set_rounding(rounding_mode):
     global ROUND_MODE
     ROUND_MODE = rounding_mode
 
+# 10**i calculado como con un exponente escalar, numpy puede calcular 10**array con otro algoritmo y
+# cambiar la última cifra del resultado
+with errstate(over='ignore', divide='ignore'):
+    _POTENCIAS_10 = array([10 ** float64(i) for i in range(-350, 351)])
+
+def _potencia_10(exponentes):
+    """10**exponentes para un array de exponentes enteros"""
+    return _POTENCIAS_10[exponentes.astype(int) + 350]
+
 def round(n, decimals=0, rounding = None):
+    """Redondea n a decimals posiciones decimales. Si decimals es un array (de enteros) se redondea cada
+    elemento de n con el número de decimales correspondiente"""
     global ROUND_MODE, ROUND_UP
-    multiplier = 10 ** decimals
+    if isinstance(decimals, ndarray):
+        multiplier = _potencia_10(decimals)
+    else:
+        multiplier = 10 ** decimals
     rounding = rounding if rounding is not None else ROUND_MODE
     if rounding is ROUND_UP:
         return floor(n*multiplier + 0.5) / multiplier
@@ -27,4 +47,15 @@ def set_precision(prec):
     mp.dps=prec
 
 def get_precision():
-    return mp.dps
\ No newline at end of file
+    return mp.dps
+
+def set_backend(backend):
+    """Cambia el almacenamiento por defecto de las medidas nuevas. FLOAT64 guarda los valores en arrays de numpy
+    y MULTIPRECISION en objetos Number con la precisión dada por set_precision"""
+    global BACKEND
+    if backend not in (FLOAT64, MULTIPRECISION):
+        raise ValueError(f'El backend {backend} no es un backend válido')
+    BACKEND = backend
+
+def get_backend():
+    return BACKEND
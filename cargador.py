@@ -1,19 +1,118 @@
 from .objetos import Medida
 from .tabla import transpose
+import os
+import numpy as np
 
 
 def cargar(archivo: str, separador: str = '\t', linea: str = '\n', decimal: str = ',', cabeceras: int = 0, por_columnas=True) -> list[list[float]]:
+    if por_columnas:
+        # Las columnas se leen por bloques con leer y solo al final se pasan a listas
+        return [columna.tolist() for columna in leer(archivo, separador, linea, decimal, cabeceras)]
     with open(archivo, 'rt') as file:
         data = file.read()
         filas = [i for i in data.split(linea) if i.strip() != '']
         datos = [[float(i.strip().replace(decimal, '.')) if i.strip() != '' else None for i in j.split(separador) ] for j in filas[cabeceras:]]
-    
-    if por_columnas:
-        max_len = max((len(i) for i in datos))        
-        datos = [[i[index] for i in datos if index < len(i) and i[index] != None] for index in range(max_len)]
-    
     return datos
 
+class _Columna:
+    '''Array de una columna que se va llenando por bloques. Se reserva la memoria estimada y se dobla si no basta'''
+    def __init__(self, capacidad):
+        self.valores = np.empty(capacidad)
+        self.n = 0
+
+    def añade(self, valores):
+        fin = self.n + valores.size
+        if fin > self.valores.size:
+            self.valores = np.resize(self.valores, max(fin, 2*self.valores.size))
+        self.valores[self.n:fin] = valores
+        self.n = fin
+
+    def array(self):
+        return self.valores[:self.n].copy() if self.n < self.valores.size else self.valores
+
+def _lee_filas(filas, separador, decimal):
+    '''
+    Valores de un bloque de filas como array (filas, columnas) y máscara de las celdas con valor. Si todas las filas
+    tienen las mismas columnas y ninguna celda vacía se leen de una vez con np.loadtxt; si no, fila a fila
+    '''
+    if decimal != '.' and decimal != separador:
+        filas = [fila.replace(decimal, '.') for fila in filas]
+    try:
+        valores = np.loadtxt(filas, delimiter=separador, dtype=float, ndmin=2, comments=None)
+        return valores, None
+    except ValueError:
+        pass
+    celdas = [fila.split(separador) for fila in filas]
+    valores = np.full((len(celdas), max(len(c) for c in celdas)), np.nan)
+    hay_valor = np.zeros(valores.shape, dtype=bool)
+    for i, fila in enumerate(celdas):
+        for j, celda in enumerate(fila):
+            celda = celda.strip()
+            if celda != '':
+                valores[i, j] = float(celda)
+                hay_valor[i, j] = True
+    return valores, hay_valor
+
+def leer(archivo: str, separador: str = '\t', linea: str = '\n', decimal: str = ',', cabeceras: int = 0,
+         por_columnas: bool = True, bloque: int = 2**24, medidas: bool = False, con_errores: bool = False):
+    """
+    Lee un archivo de datos como cargar (mismas opciones) pero por bloques de unos bloque caracteres, por lo que la
+    memoria usada mientras se lee no depende del tamaño del archivo. Cada bloque se convierte de una vez con
+    np.loadtxt (o fila a fila si tiene celdas vacías o filas con distinto número de columnas) y se copia en arrays
+    reservados con el tamaño estimado del archivo.
+    Con por_columnas devuelve un array por columna, sin las celdas vacías (las columnas pueden tener distinta
+    longitud); si no, un array (filas, columnas) con nan en las celdas vacías. Con medidas devuelve una medida por
+    columna, y con con_errores además las columnas van por parejas (valor, error)
+    """
+    tamaño = os.path.getsize(archivo)
+    columnas = []
+    filas_leidas = []
+    capacidad = None
+    por_saltar = cabeceras
+    with open(archivo, 'rt') as file:
+        resto = ''
+        while True:
+            texto = file.read(bloque)
+            fin = not texto
+            texto = resto + texto
+            if fin:
+                filas, resto = texto.split(linea), ''
+            else:
+                # La última fila puede estar a medias, se deja para el siguiente bloque
+                filas = texto.split(linea)
+                resto = filas.pop()
+            filas = [fila for fila in filas if fila.strip() != '']
+            if por_saltar:
+                filas, por_saltar = filas[por_saltar:], max(por_saltar - len(filas), 0)
+            if filas:
+                valores, hay_valor = _lee_filas(filas, separador, decimal)
+                if not por_columnas:
+                    filas_leidas.append(valores)
+                else:
+                    if capacidad is None:
+                        # Filas estimadas a partir del tamaño medio de las filas del primer bloque
+                        capacidad = int(tamaño/max(len(texto) - len(resto), 1)*len(filas)*1.05) + 1
+                    while len(columnas) < valores.shape[1]:
+                        columnas.append(_Columna(capacidad))
+                    for j in range(valores.shape[1]):
+                        columnas[j].añade(valores[:, j] if hay_valor is None else valores[hay_valor[:, j], j])
+            if fin:
+                break
+    if not por_columnas:
+        ancho = max((v.shape[1] for v in filas_leidas), default=0)
+        datos = np.full((sum(v.shape[0] for v in filas_leidas), ancho), np.nan)
+        inicio = 0
+        for v in filas_leidas:
+            datos[inicio:inicio + v.shape[0], :v.shape[1]] = v
+            inicio += v.shape[0]
+        return datos
+    datos = [columna.array() for columna in columnas]
+    if not medidas:
+        return datos
+    if con_errores:
+        return [Medida(valores, errores) for valores, errores in zip(datos[::2], datos[1::2])]
+    return [Medida(valores) for valores in datos]
+
 def guardar_latex(archivo: str, datos: list, separador: str = '\t', linea: str = '\n', por_columnas=True, estilo = Medida.Estilo.tabla_latex):
     
     # Conversión de datos a strings
@@ -1,10 +1,471 @@
 import numpy as np
 
+class Resumen:
+    """
+    Número de valores, media, suma de los cuadrados de las desviaciones a la media y suma de los cuadrados de los
+    errores de unos datos, de los que salen la desviación estándar, el error estándar y la estimación de una medida.
+    Los datos se pueden añadir por bloques con añade, por lo que no hace falta tenerlos todos en memoria a la vez.
+    En cada bloque se hacen dos pasadas vectorizadas (media y desviaciones, con las sumas por parejas de numpy) y los
+    bloques se unen con la fórmula de Chan, sin restar sumas grandes entre sí. Con axis los estadísticos se calculan
+    a lo largo de ese eje (los bloques se concatenan en él) y son arrays con la forma del resto de ejes.
+    Funciona igual con arrays de float y de Number (precisión múltiple)
+    """
+    def __init__(self, axis: int = None):
+        self.axis = axis
+        self.n = 0
+        self.media = self.m2 = self.errores2 = 0
+
+    def añade(self, valores, errores=None):
+        """Añade un bloque de valores (y sus errores, por defecto 0). Devuelve el propio resumen"""
+        valores = np.asarray(valores)
+        bloque = Resumen(self.axis)
+        if errores is not None:
+            bloque.errores2 = np.sum(np.square(np.broadcast_to(errores, valores.shape)), axis=self.axis)
+        if self.axis is None:
+            valores = valores.ravel()
+        eje = -1 if self.axis is None else self.axis
+        bloque.n = valores.shape[eje]
+        if bloque.n == 0:
+            return self
+        bloque.media = np.sum(valores, axis=eje)/bloque.n
+        desviaciones = valores - np.expand_dims(bloque.media, eje)
+        bloque.m2 = np.sum(desviaciones*desviaciones, axis=eje)
+        return self.combina(bloque)
+
+    def combina(self, otro):
+        """Añade los datos de otro resumen (del mismo eje). Devuelve el propio resumen"""
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2, self.errores2 = otro.n, otro.media, otro.m2, otro.errores2
+            return self
+        total = self.n + otro.n
+        delta = otro.media - self.media
+        self.m2 = self.m2 + otro.m2 + delta*delta*(self.n*otro.n/total)
+        self.media = self.media + delta*(otro.n/total)
+        self.errores2 = self.errores2 + otro.errores2
+        self.n = total
+        return self
+
+    def varianza(self):
+        """Varianza de los valores, nan con menos de dos valores (también en precisión múltiple)"""
+        if self.n < 2:
+            return np.full(np.shape(self.m2), np.nan)[()]
+        return self.m2/np.float64(self.n - 1)
+
+    def desviacion_estandar(self):
+        return np.sqrt(self.varianza())
+
+    def error_estandar(self):
+        """Desviación estándar de la media"""
+        return self.desviacion_estandar()/np.sqrt(self.n)
+
+    def error_cuadratico_medio(self):
+        """Error de la media debido a los errores de los valores: raíz de la suma de sus cuadrados entre n"""
+        return np.sqrt(self.errores2)/self.n
+
+    def estimacion(self):
+        """
+        Media y el mayor entre el error estándar y el error cuadrático medio. Con un solo valor no hay error estándar
+        y el error es el cuadrático medio
+        """
+        if self.n < 2:
+            return self.media, self.error_cuadratico_medio()
+        return self.media, np.fmax(self.error_estandar(), self.error_cuadratico_medio())
+
+def resumen(valores, errores=None, axis: int = None) -> Resumen:
+    """Resumen estadístico de los valores (y sus errores) en una sola pasada. valores puede ser una medida"""
+    from .objetos import Medida
+    if isinstance(valores, Medida):
+        valores, errores = valores._medida, valores._error if errores is None else errores
+    return Resumen(axis).añade(valores, errores)
+
+def resumen_bloques(bloques, axis: int = None) -> Resumen:
+    """
+    Resumen estadístico de datos que llegan por bloques (un generador que lee un archivo por partes, por ejemplo).
+    Cada bloque es un array de valores, una tupla (valores, errores) o una medida
+    """
+    from .objetos import Medida
+    total = Resumen(axis)
+    for bloque in bloques:
+        if isinstance(bloque, Medida):
+            total.añade(bloque._medida, bloque._error)
+        elif isinstance(bloque, tuple):
+            total.añade(*bloque)
+        else:
+            total.añade(bloque)
+    return total
+
+def agrupa(valores, errores, claves, pesado: bool = True):
+    """
+    Combina los valores que tienen la misma clave (un número de canal, un punto de consigna...). Con pesado=True la
+    media de cada grupo está pesada con el inverso de la varianza (1/error²) y su error es 1/√(Σ 1/error²); si no,
+    la media es la normal y el error el mayor entre el error estándar y el cuadrático medio, como en
+    Medida.estimacion. Se ordenan las claves una vez (np.unique, o sin ordenar si son enteros en un rango pequeño) y
+    las sumas de cada grupo se hacen con np.bincount, sin bucles de Python. Los cálculos se hacen con float64
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (claves sin repetir ordenadas, media, error y número
+        de valores de cada grupo)
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    errores = np.broadcast_to(np.asarray(errores, dtype=float), np.shape(valores)).ravel()
+    claves = np.asarray(claves).ravel()
+    if claves.size != valores.size:
+        raise ValueError(f'Hay {claves.size} claves para {valores.size} valores')
+    if claves.dtype.kind in 'iu' and claves.size and int(claves.max()) - int(claves.min()) <= max(claves.size, 2**20):
+        # Claves enteras en un rango pequeño: se cuentan directamente sin ordenar y se quitan las que no aparecen
+        minimo = claves.min()
+        desplazadas = claves - minimo
+        presentes = np.bincount(desplazadas) > 0
+        unicas = np.flatnonzero(presentes).astype(claves.dtype) + minimo
+        grupo = (np.cumsum(presentes) - 1)[desplazadas]
+    else:
+        unicas, grupo = np.unique(claves, return_inverse=True)
+    grupos = unicas.size
+    cuentas = np.bincount(grupo, minlength=grupos)
+    if pesado:
+        if np.any(errores == 0):
+            raise ValueError('La media pesada necesita que todos los valores tengan error')
+        pesos = 1/errores**2
+        suma_pesos = np.bincount(grupo, pesos, grupos)
+        media = np.bincount(grupo, pesos*valores, grupos)/suma_pesos
+        return unicas, media, 1/np.sqrt(suma_pesos), cuentas
+    media = np.bincount(grupo, valores, grupos)/cuentas
+    # Segunda pasada con las desviaciones a la media de cada grupo, para no restar sumas grandes
+    desviaciones = valores - media[grupo]
+    # Los grupos de un solo valor no tienen error estándar (nan) y se quedan con el cuadrático medio
+    with np.errstate(divide='ignore', invalid='ignore'):
+        varianza = np.bincount(grupo, desviaciones*desviaciones, grupos)/(cuentas - 1.0)
+    error_estandar = np.sqrt(varianza/cuentas)
+    error_cuadratico_medio = np.sqrt(np.bincount(grupo, errores*errores, grupos))/cuentas
+    return unicas, media, np.fmax(error_estandar, error_cuadratico_medio), cuentas
+
+LINEAL = 'lineal'
+LOG = 'log'
+CUANTILES = 'cuantiles'
+
+def bordes(x=None, intervalos: int = 10, escala: str = LINEAL, rango: tuple = None) -> np.ndarray:
+    """
+    Bordes de intervalos iguales (escala LINEAL), iguales en escala logarítmica (LOG) o con el mismo número de
+    valores de x en cada uno (CUANTILES) entre los extremos de rango o, si no se pasa, de x
+    """
+    if x is not None:
+        x = np.asarray(getattr(x, '_medida', x), dtype=float).ravel()
+    if escala == CUANTILES:
+        if x is None:
+            raise TypeError('Los intervalos por cuantiles necesitan los valores de x')
+        if rango is not None:
+            x = x[(x >= rango[0]) & (x <= rango[1])]
+        # Si muchos valores se repiten dos cuantiles pueden coincidir, se quitan los bordes repetidos
+        return np.unique(np.quantile(x, np.linspace(0, 1, intervalos + 1)))
+    if rango is None:
+        if x is None:
+            raise TypeError('Hay que pasar x o el rango de los intervalos')
+        rango = (x.min(), x.max())
+    if escala == LOG:
+        return np.geomspace(rango[0], rango[1], intervalos + 1)
+    if escala == LINEAL:
+        return np.linspace(rango[0], rango[1], intervalos + 1)
+    raise ValueError(f'La escala {escala} no es válida, debe ser LINEAL, LOG o CUANTILES')
+
+class Histograma:
+    """
+    Agrupa puntos (x, y) en los intervalos de x dados por los bordes (ver bordes) y acumula en cada uno el número de
+    puntos, las medias de x y de y, la dispersión de y y la suma de los cuadrados de los errores. Los puntos se
+    añaden por bloques con añade, así que se puede hacer el histograma de un archivo que no cabe en memoria leyéndolo
+    por partes. Cada bloque se reparte en los intervalos con np.searchsorted y se suma con np.bincount; los bloques
+    se unen con la fórmula de Chan, como en Resumen. Los puntos fuera de los bordes se ignoran y el último borde
+    está incluido en el último intervalo
+    """
+    def __init__(self, bordes):
+        self.bordes = np.asarray(bordes, dtype=float)
+        n = self.bordes.size - 1
+        self.cuentas = np.zeros(n, dtype=np.int64)
+        self.media_x = np.zeros(n)
+        self.media_y = np.zeros(n)
+        self.m2_y = np.zeros(n)
+        self.errores2_x = np.zeros(n)
+        self.errores2_y = np.zeros(n)
+        self.con_y = None
+
+    def añade(self, x, y=None):
+        """Añade un bloque de puntos. x e y pueden ser medidas (se acumulan sus errores) o arrays"""
+        x, errores_x = _valores_errores(x)
+        con_y = y is not None
+        if self.con_y is None:
+            self.con_y = con_y
+        elif self.con_y != con_y:
+            raise ValueError('Todos los bloques deben tener y o ninguno')
+        if con_y:
+            y, errores_y = _valores_errores(y)
+            y, errores_y = np.broadcast_to(y, x.shape), np.broadcast_to(errores_y, x.shape)
+        n = self.cuentas.size
+        intervalo = np.searchsorted(self.bordes, x, side='right') - 1
+        intervalo[x == self.bordes[-1]] = n - 1
+        dentro = (intervalo >= 0) & (intervalo < n)
+        if not np.all(dentro):
+            intervalo, x, errores_x = intervalo[dentro], x[dentro], np.broadcast_to(errores_x, dentro.shape)[dentro]
+            if con_y:
+                y, errores_y = y[dentro], errores_y[dentro]
+        cuentas = np.bincount(intervalo, minlength=n)
+        # Los intervalos vacíos del bloque no cambian nada: se divide entre 1 para no dividir entre 0
+        divisor = np.maximum(cuentas, 1)
+        total = self.cuentas + cuentas
+        fraccion = cuentas/np.maximum(total, 1)
+        self.media_x += (np.bincount(intervalo, x, n)/divisor - self.media_x)*fraccion
+        self.errores2_x += np.bincount(intervalo, np.broadcast_to(errores_x, x.shape)**2, n)
+        if con_y:
+            media = np.bincount(intervalo, y, n)/divisor
+            desviaciones = y - media[intervalo]
+            m2 = np.bincount(intervalo, desviaciones*desviaciones, n)
+            delta = media - self.media_y
+            self.m2_y += m2 + delta*delta*self.cuentas*fraccion
+            self.media_y += delta*fraccion
+            self.errores2_y += np.bincount(intervalo, errores_y**2, n)
+        self.cuentas = total
+        return self
+
+    def resultado(self, vacios: bool = False):
+        """
+        Medidas de x e y por intervalo. x es la media de los valores del intervalo con su error propagado. Si se
+        añadieron valores de y, y es su media y su error el mayor entre el error estándar y el propagado (como en
+        Medida.estimacion); si no, y es el número de puntos con su error de Poisson (√n). Sin vacios se quitan los
+        intervalos sin puntos
+
+        Returns:
+            tuple[Medida, Medida, np.ndarray, np.ndarray]: (x, y, desviación estándar de y en cada intervalo o None,
+            número de puntos de cada intervalo)
+        """
+        from .objetos import Medida
+        usados = slice(None) if vacios else self.cuentas > 0
+        cuentas = self.cuentas[usados]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = Medida._desde_arrays(np.where(cuentas > 0, self.media_x[usados], np.nan),
+                                     np.sqrt(self.errores2_x[usados])/cuentas)
+            if not self.con_y:
+                return x, Medida._desde_arrays(cuentas.astype(float), np.sqrt(cuentas)), None, cuentas
+            dispersion = np.sqrt(self.m2_y[usados]/(cuentas - 1))
+            # fmax: en los intervalos con un solo punto no hay dispersión y queda el error propagado
+            error = np.fmax(dispersion/np.sqrt(cuentas), np.sqrt(self.errores2_y[usados])/cuentas)
+            y = Medida._desde_arrays(np.where(cuentas > 0, self.media_y[usados], np.nan), error)
+        return x, y, dispersion, cuentas
+
+def _valores_errores(valores):
+    '''Valores y errores (0 si no es una medida) como arrays de float planos'''
+    errores = getattr(valores, '_error', 0)
+    valores = getattr(valores, '_medida', valores)
+    valores = np.asarray(valores, dtype=float).ravel()
+    return valores, np.asarray(errores, dtype=float).ravel() if np.ndim(errores) else np.float64(errores)
+
+def histograma(x, y=None, intervalos: int = 10, escala: str = LINEAL, rango: tuple = None, vacios: bool = False):
+    """
+    Agrupa los puntos (x, y) en intervalos de x (ver bordes y Histograma) y devuelve las medidas de cada intervalo,
+    listas para ajuste.minimos_pesados o plot.errorbar. Sin y es un histograma de x
+
+    Returns:
+        tuple[Medida, Medida, np.ndarray, np.ndarray]: ver Histograma.resultado
+    """
+    return Histograma(bordes(x, intervalos, escala, rango)).añade(x, y).resultado(vacios)
+
+VALIDO = 'valido'
+IGUAL = 'igual'
+
+def _limites_ventanas(n, ventana, modo):
+    '''Inicio y fin (sin incluir) de cada ventana. Con IGUAL hay una centrada en cada punto, recortada en los bordes'''
+    if ventana < 1:
+        raise ValueError('La ventana debe tener al menos un punto')
+    if modo == VALIDO:
+        inicio = np.arange(max(n - ventana + 1, 0))
+        return inicio, inicio + ventana
+    if modo == IGUAL:
+        inicio = np.arange(n) - ventana//2
+        return np.clip(inicio, 0, n), np.clip(inicio + ventana, 0, n)
+    raise ValueError(f'El modo {modo} no es válido, debe ser VALIDO o IGUAL')
+
+def _por_bloques(valores, tamaño, acumula):
+    '''
+    Parte la serie en bloques de tamaño puntos y aplica acumula (que devuelve una tupla de arrays acumulados a lo largo
+    del primer eje) a cada bloque desde su principio y desde su final hacia atrás. Cada bloque va en una columna,
+    para que las operaciones trabajen con filas contiguas, y el último, si está incompleto, va aparte
+
+    Returns:
+        tuple[list[np.ndarray], list[np.ndarray]]: los arrays acumulados hacia delante y hacia atrás, planos
+    '''
+    completos = valores.size//tamaño*tamaño
+    delante, detras = [], []
+    for bloques in (valores[:completos].reshape(-1, tamaño).T, valores[completos:, None]):
+        delante.append([a.T.ravel() for a in acumula(bloques)])
+        detras.append([a[::-1].T.ravel() for a in acumula(bloques[::-1])])
+    return [np.concatenate(a) for a in zip(*delante)], [np.concatenate(a) for a in zip(*detras)]
+
+def _elige(inicio, ultimo, tamaño, unidos, delante, detras):
+    '''
+    Resultado de cada ventana: une el final de un bloque y el principio del siguiente y, si está dentro de un bloque,
+    empieza en su principio (delante) o acaba al final de la serie (detras)
+    '''
+    return np.where(inicio//tamaño != ultimo//tamaño, unidos, np.where(inicio % tamaño == 0, delante, detras))
+
+def _sumas_ventanas(valores, inicio, fin, ventana):
+    '''
+    Suma de valores[inicio:fin] de cada ventana. Como en _posicion_maximo cada ventana es el final de un bloque de
+    ventana puntos y el principio del siguiente, y sus sumas salen de sumas acumuladas dentro de cada bloque. No se
+    restan sumas acumuladas de toda la serie, que pierden las cifras de los valores pequeños si antes hay valores
+    grandes. El coste no depende de la ventana
+    '''
+    if inicio.size == 0:
+        return np.zeros(0)
+    tamaño = min(ventana, valores.size)
+    (delante, ), (detras, ) = _por_bloques(valores, tamaño, lambda bloques: (np.cumsum(bloques, axis=0), ))
+    ultimo = fin - 1
+    return _elige(inicio, ultimo, tamaño, detras[inicio] + delante[ultimo], delante[ultimo], detras[inicio])
+
+def _ventanas(medida, ventana, modo):
+    '''Valores, errores, inicio, fin y número de puntos de cada ventana de una medida (o array) plana'''
+    valores, errores = _valores_errores(medida)
+    inicio, fin = _limites_ventanas(valores.size, ventana, modo)
+    return valores, np.broadcast_to(errores, valores.shape), inicio, fin, fin - inicio
+
+def suma_movil(medida, ventana: int, modo: str = IGUAL):
+    """
+    Suma de los valores en una ventana móvil de ventana puntos, con el error propagado (√Σerror²). Con modo=IGUAL
+    hay un resultado por punto (ventana centrada, recortada en los extremos) y con VALIDO solo las ventanas completas.
+    Las operaciones móviles usan sumas acumuladas dentro de bloques, con coste O(n) sea cual sea la ventana. La
+    medida se trata como una serie plana
+    """
+    from .objetos import Medida
+    valores, errores, inicio, fin, n = _ventanas(medida, ventana, modo)
+    suma = _sumas_ventanas(valores, inicio, fin, ventana)
+    return Medida._desde_arrays(suma, np.sqrt(_sumas_ventanas(errores**2, inicio, fin, ventana)))
+
+def media_movil(medida, ventana: int, modo: str = IGUAL):
+    """Media móvil de los valores con su error propagado (√Σerror²/n), ver suma_movil"""
+    from .objetos import Medida
+    valores, errores, inicio, fin, n = _ventanas(medida, ventana, modo)
+    media = _sumas_ventanas(valores, inicio, fin, ventana)/n
+    return Medida._desde_arrays(media, np.sqrt(_sumas_ventanas(errores**2, inicio, fin, ventana))/n)
+
+def media_pesada_movil(medida, ventana: int, modo: str = IGUAL):
+    """Media móvil pesada con el inverso de la varianza, de error 1/√(Σ 1/error²), ver suma_movil"""
+    from .objetos import Medida
+    valores, errores, inicio, fin, n = _ventanas(medida, ventana, modo)
+    if np.any(errores == 0):
+        raise ValueError('La media pesada necesita que todos los valores tengan error')
+    pesos = 1/errores**2
+    suma_pesos = _sumas_ventanas(pesos, inicio, fin, ventana)
+    media = _sumas_ventanas(pesos*valores, inicio, fin, ventana)/suma_pesos
+    return Medida._desde_arrays(media, 1/np.sqrt(suma_pesos))
+
+def _une(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    '''Media y suma de cuadrados de las desviaciones de dos grupos unidos (fórmula de Chan)'''
+    fraccion = n_b/(n_a + n_b)
+    delta = media_b - media_a
+    # Operaciones en el sitio para no crear un array temporal por cada una
+    desplazamiento = delta*fraccion
+    delta *= desplazamiento
+    delta *= n_a
+    delta += m2_a
+    delta += m2_b
+    desplazamiento += media_a
+    return desplazamiento, delta
+
+def _acumula(valores):
+    '''
+    Media y suma de cuadrados de las desviaciones de cada columna desde su principio hasta cada fila. Es un barrido
+    de Hillis-Steele que une grupos con la fórmula de Chan (log2(filas) pasos vectorizados), por lo que no se restan
+    sumas grandes entre sí
+    '''
+    media, m2 = valores.copy(), np.zeros(valores.shape)
+    fila = np.arange(valores.shape[0])[:, None]
+    paso = 1
+    while paso < valores.shape[0]:
+        # Antes del paso la fila j resume sus min(j + 1, paso) últimos puntos y se une con la que acaba paso filas
+        # antes. El resultado se calcula entero antes de escribirlo
+        media[paso:], m2[paso:] = _une(np.minimum(fila[:-paso] + 1, paso), media[:-paso], m2[:-paso],
+                                       paso, media[paso:], m2[paso:])
+        paso *= 2
+    return media, m2
+
+def desviacion_movil(medida, ventana: int, modo: str = IGUAL) -> np.ndarray:
+    """
+    Desviación estándar de los valores en cada ventana (nan si solo tiene un punto), ver suma_movil. Como en
+    _posicion_maximo la serie se parte en bloques de ventana puntos y cada ventana es el final de un bloque y el
+    principio del siguiente; sus estadísticos acumulados se unen con la fórmula de Chan, sin restar sumas acumuladas
+    de toda la serie, que pierden todas las cifras si los valores se alejan mucho de su media. El coste es
+    O(n log ventana)
+    """
+    valores, _, inicio, fin, n = _ventanas(medida, ventana, modo)
+    if inicio.size == 0:
+        return np.zeros(0)
+    tamaño = min(ventana, valores.size)
+    # Media y desviaciones acumuladas desde el principio de cada bloque y desde el final hacia atrás
+    (media_delante, m2_delante), (media_detras, m2_detras) = _por_bloques(valores, tamaño, _acumula)
+    ultimo = fin - 1
+    n_detras = np.minimum(inicio//tamaño*tamaño + tamaño, valores.size) - inicio
+    n_delante = ultimo % tamaño + 1
+    _, unidos = _une(n_detras, media_detras[inicio], m2_detras[inicio], n_delante, media_delante[ultimo],
+                     m2_delante[ultimo])
+    m2 = _elige(inicio, ultimo, tamaño, unidos, m2_delante[ultimo], m2_detras[inicio])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 1, np.sqrt(np.maximum(m2, 0)/(n - 1)), np.nan)
+
+def _posicion_maximo(valores, ventana):
+    '''
+    Posición del máximo de cada ventana completa valores[i:i + ventana] con el algoritmo de van Herk/Gil-Werman:
+    se parte la serie en bloques de ventana puntos y cada ventana es el final de un bloque y el principio del
+    siguiente, cuyos máximos salen de los máximos acumulados de cada bloque hacia delante y hacia atrás
+    '''
+    n = valores.size
+    bloques = -(-n//ventana)
+    relleno = np.full(bloques*ventana - n, -np.inf)
+    v = np.concatenate((valores, relleno)).reshape(bloques, ventana)
+    posicion = np.arange(bloques*ventana).reshape(bloques, ventana)
+    # Máximo desde el principio del bloque y posición del primer punto que lo alcanza (donde el máximo crece)
+    delante = np.maximum.accumulate(v, axis=1)
+    crece = np.ones(v.shape, dtype=bool)
+    crece[:, 1:] = delante[:, 1:] > delante[:, :-1]
+    pos_delante = np.maximum.accumulate(np.where(crece, posicion, 0), axis=1)
+    # Máximo hasta el final del bloque y posición del primer punto que lo alcanza
+    detras = np.maximum.accumulate(v[:, ::-1], axis=1)[:, ::-1]
+    invertida = np.where(v == detras, posicion, bloques*ventana)[:, ::-1]
+    pos_detras = np.minimum.accumulate(invertida, axis=1)[:, ::-1]
+    inicio = np.arange(n - ventana + 1)
+    fin = inicio + ventana - 1
+    delante, pos_delante = delante.ravel()[fin], pos_delante.ravel()[fin]
+    detras, pos_detras = detras.ravel()[inicio], pos_detras.ravel()[inicio]
+    # Si los dos máximos son iguales se toma el primero, como np.argmax
+    return np.where(detras >= delante, pos_detras, pos_delante)
+
+def _extremo_movil(medida, ventana, modo, signo):
+    from .objetos import Medida
+    valores, errores = _valores_errores(medida)
+    errores = np.broadcast_to(errores, valores.shape)
+    _limites_ventanas(valores.size, ventana, modo)
+    if modo == IGUAL:
+        # Se rellena con -inf para que las ventanas recortadas de los extremos sean ventanas completas
+        izquierda = ventana//2
+        relleno = np.concatenate((np.full(izquierda, -np.inf), signo*valores,
+                                  np.full(ventana - 1 - izquierda, -np.inf)))
+        posicion = _posicion_maximo(relleno, ventana) - izquierda
+    elif valores.size < ventana:
+        posicion = np.zeros(0, dtype=int)
+    else:
+        posicion = _posicion_maximo(signo*valores, ventana)
+    return Medida._desde_arrays(valores[posicion], errores[posicion].copy())
+
+def maximo_movil(medida, ventana: int, modo: str = IGUAL):
+    """Máximo de cada ventana, con el error del punto que lo alcanza, ver suma_movil"""
+    return _extremo_movil(medida, ventana, modo, 1)
+
+def minimo_movil(medida, ventana: int, modo: str = IGUAL):
+    """Mínimo de cada ventana, con el error del punto que lo alcanza, ver suma_movil"""
+    return _extremo_movil(medida, ventana, modo, -1)
+
 def media(*args: float) -> float:
-    return np.array(sum(args)/len(args))
+    return np.array(Resumen().añade(np.array(args)).media)
 
 def desviacion_estandar(*args: float) -> float:
-    return np.sqrt(sum((args - media(*args))**2)/(len(args)-1))
+    return Resumen().añade(np.array(args)).desviacion_estandar()
 
 def error_estandar(*args: float) -> float:
-    return desviacion_estandar(*args)/np.sqrt(len(args))
+    return Resumen().añade(np.array(args)).error_estandar()
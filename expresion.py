@@ -0,0 +1,154 @@
+'''
+Expresiones perezosas de medidas. Medida.perezosa() devuelve una Expresion sobre la que las operaciones no se calculan
+sino que se guardan en un grafo. Al evaluarla se calculan solo los valores (sin medidas ni errores intermedios) y
+después los errores con una única pasada hacia atrás (modo inverso), sumando las derivadas de cada medida antes de
+elevarlas al cuadrado: si una misma medida aparece varias veces en la expresión su error se propaga correctamente
+'''
+import numpy as np
+from .objetos import Medida, _DERIVADAS, _cuadratura, _mp, _sin_mpf
+
+
+def _producto(a, b):
+    '''a*b sin crear un array nuevo si alguno de los dos es la constante 1 o -1 de las derivadas'''
+    if type(a) is int and abs(a) == 1:
+        a, b = b, a
+    if type(b) is int and abs(b) == 1:
+        return a if b == 1 else -a
+    return a*b
+
+
+class Expresion:
+    """
+    Nodo de una expresión perezosa: una medida, una constante (sin error) o una ufunc de _DERIVADAS aplicada a otras
+    expresiones. Se opera igual que una medida y se calcula con evalua(). Dos apariciones del mismo objeto Medida
+    se consideran la misma variable. El error se propaga a primer orden, sin la corrección de los extremos del seno
+    y del coseno que se hace al operar medidas
+    """
+    def __init__(self, valor, ufunc=None, argumentos=()):
+        self._ufunc = ufunc
+        self._argumentos = argumentos
+        self._medida = valor if isinstance(valor, Medida) else None
+        self._valor = None if ufunc is not None or self._medida is not None else np.asarray(valor)
+        # Solo se derivan los nodos que dependen de alguna medida
+        self._depende = self._medida is not None or any(a._depende for a in argumentos)
+
+    @staticmethod
+    def _como_expresion(valor):
+        return valor if isinstance(valor, Expresion) else Expresion(valor)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs or ufunc not in _DERIVADAS:
+            return NotImplemented
+        return Expresion(None, ufunc, tuple(self._como_expresion(i) for i in inputs))
+
+    def _orden(self):
+        '''Nodos de la expresión sin repetir y en orden topológico (cada uno después de sus argumentos)'''
+        orden, vistos, pila = [], set(), [(self, False)]
+        while pila:
+            nodo, terminado = pila.pop()
+            if terminado:
+                orden.append(nodo)
+            elif id(nodo) not in vistos:
+                vistos.add(id(nodo))
+                pila.append((nodo, True))
+                pila.extend((a, False) for a in nodo._argumentos)
+        return orden
+
+    def _calcula(self):
+        '''Valor de la expresión y, por id, cada medida de la que depende con la derivada respecto a ella'''
+        orden = self._orden()
+        multiprecision = any(n._medida is not None and n._medida._medida.dtype == object for n in orden)
+        valores = {}
+        for nodo in orden:
+            if nodo._medida is not None:
+                valores[id(nodo)] = _mp(nodo._medida._medida)
+            elif nodo._ufunc is None:
+                valores[id(nodo)] = _mp(_sin_mpf(nodo._valor, multiprecision))
+            else:
+                valores[id(nodo)] = nodo._ufunc(*(valores[id(a)] for a in nodo._argumentos))
+        resultado = valores[id(self)]
+
+        # Pasada inversa: derivada de la expresión respecto a cada nodo, con la forma del resultado
+        adjuntos = {id(self): 1}
+        medidas = {}
+        for nodo in reversed(orden):
+            adjunto = adjuntos.pop(id(nodo), None)
+            if adjunto is None or not nodo._depende:
+                continue
+            if nodo._medida is not None:
+                medida, anterior = medidas.get(id(nodo._medida), (nodo._medida, None))
+                medidas[id(medida)] = (medida, adjunto if anterior is None else anterior + adjunto)
+                continue
+            entradas = [valores[id(a)] for a in nodo._argumentos]
+            for derivada, argumento in zip(_DERIVADAS[nodo._ufunc], nodo._argumentos):
+                if argumento._depende:
+                    parcial = _producto(adjunto, derivada(*entradas, valores[id(nodo)]))
+                    anterior = adjuntos.get(id(argumento))
+                    adjuntos[id(argumento)] = parcial if anterior is None else anterior + parcial
+        return resultado, medidas
+
+    def evalua(self) -> Medida:
+        """Calcula la expresión y devuelve la medida resultante"""
+        resultado, medidas = self._calcula()
+        terminos = [_producto(adjunto, _mp(medida._error)) for medida, adjunto in medidas.values()]
+        # Una expresión sin medidas (solo constantes) no tiene error
+        error = _cuadratura(terminos) if terminos else np.zeros(np.shape(resultado))
+        if np.shape(error) != np.shape(resultado):
+            error = np.array(np.broadcast_to(error, np.shape(resultado)))
+        return Medida._desde_arrays(resultado, error)
+
+    def derivadas(self, *medidas: Medida) -> list:
+        """
+        Derivadas de la expresión respecto a cada una de las medidas dadas, como arrays con la forma del resultado
+        (la derivada de cada elemento del resultado). Las medidas que no aparecen en la expresión tienen derivada 0
+        """
+        resultado, adjuntos = self._calcula()
+        forma = np.shape(resultado)
+        return [np.array(np.broadcast_to(adjuntos[id(m)][1], forma)) if id(m) in adjuntos else np.zeros(forma)
+                for m in medidas]
+
+    def __add__(self, other):
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        return np.true_divide(other, self)
+
+    def __pow__(self, other):
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        return np.power(other, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+    def __pos__(self):
+        return self
+
+    def __str__(self):
+        return str(self.evalua())
+
+    def __repr__(self):
+        if self._medida is not None:
+            return f'Medida{self._medida.shape}'
+        if self._ufunc is None:
+            return repr(self._valor.tolist())
+        return f'{self._ufunc.__name__}({", ".join(repr(a) for a in self._argumentos)})'
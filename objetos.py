@@ -1,8 +1,11 @@
 from .aprox import aprox
-from .estadistica import media, desviacion_estandar, error_estandar
+from . import estadistica
+from .estadistica import Resumen, agrupa
 import numpy as np
 from math import nan, ceil, floor
 import mpmath
+from mpmath.libmp import from_int, from_str
+from functools import lru_cache
 from . import calculos
 
 
@@ -11,45 +14,180 @@ VALOR = object()
 ERROR = object()
 
 
-def _tratar_error(medida, error):
+def _como_array(valores, backend):
+    '''
+    Convierte un iterable de valores (de cualquier dimensión) en el array que usa una medida con el backend dado:
+    np.ndarray[float] para FLOAT64 y np.ndarray[Number] para MULTIPRECISION
+    '''
+    if isinstance(valores, Medida):
+        valores = valores._medida
+    elif not isinstance(valores, (np.ndarray, list, tuple)):
+        valores = list(valores)
+    if backend == calculos.FLOAT64:
+        return np.array(valores, dtype=float)
+    return _a_number(np.array(valores, dtype=object))
+
+def _tratar_error(medida, error, backend = calculos.FLOAT64):
     '''
     Convierte un error pasado a una medida en un error que la medida puede manejar
-    El tipo debe ser np.ndarray[Number]. Si se pasa un solo valor a la función se
-    toma como un error constante para toda la medida
+    El tipo debe ser el mismo que el de la medida (ver _como_array). Si se pasa un solo valor a la función se
+    toma como un error constante para toda la medida. En otro caso la forma del error debe poder extenderse
+    (broadcasting de numpy) a la de la medida
     '''
-    
-    if hasattr(error, '__iter__'):
-        if not len(medida) == len(error):
-            if len(error) != 1:
-                raise ValueError(
-                "No hay el mismo número de medidas que de errores o no es un error constante")
-            error = (error * len(medida))
-    else:
-                error = [error]*len(medida)
-    return np.array([abs(Number(i)) for i in error])
+    if not hasattr(error, '__iter__'):
+        error = [error]
+    # El valor absoluto se toma antes de extender el error: un error constante se queda en un solo Number
+    # compartido por todos los elementos
+    error = abs(_como_array(error, backend))
+    try:
+        error = np.broadcast_to(error, medida.shape)
+    except ValueError:
+        raise ValueError(
+            "No hay el mismo número de medidas que de errores o no es un error constante") from None
+    return error.copy()
+
+def _indica_valor_o_error(index):
+    '''Comprueba si un índice es de la forma [indice, VALOR] o [indice, ERROR]'''
+    return isinstance(index, tuple) and len(index) == 2 and (index[1] is VALOR or index[1] is ERROR)
+
+def _formato(numero):
+    '''Representación en texto de un valor. Es la misma para los dos backends'''
+    return str(numero if isinstance(numero, Number) else Number(numero))
+
+def _formatos(valores: np.ndarray) -> list:
+    '''Aplica _formato a cada valor de un array, devuelve listas anidadas con la forma del array'''
+    return np.frompyfunc(_formato, 1, 1)(valores).tolist()
+
+def _pm(medida: np.ndarray, error: np.ndarray) -> str:
+    '''medida ± error separados por comas, con cada fila en una línea si hay más de una dimensión'''
+    if medida.ndim > 1:
+        return '\n'.join(_pm(m, e) for m, e in zip(medida, error))
+    return ', '.join(f'{_formato(m)} ± {_formato(e)}' for m, e in zip(medida, error))
+
+# Derivadas parciales de las ufuncs de numpy que se pueden aplicar a una medida. Hay una función por cada entrada
+# de la ufunc que recibe los valores de todas las entradas y el resultado. El error se propaga en cuadratura solo
+# con las derivadas de las entradas que son medidas. Las derivadas llevan su signo, que importa en las expresiones
+# perezosas cuando una medida aparece varias veces
+_DERIVADAS = {
+    np.add:         (lambda a, b, r: 1, lambda a, b, r: 1),
+    np.subtract:    (lambda a, b, r: 1, lambda a, b, r: -1),
+    np.multiply:    (lambda a, b, r: b, lambda a, b, r: a),
+    np.true_divide: (lambda a, b, r: 1/b, lambda a, b, r: -a/b**2),
+    np.power:       (lambda a, b, r: b*a**(b-1), lambda a, b, r: r*np.log(a)),
+    np.negative:    (lambda a, r: -1, ),
+    # En 0 se toma la derivada por la derecha, para que el error no desaparezca (como en abs(m))
+    np.absolute:    (lambda a, r: np.where(a < 0, -1, 1), ),
+    np.positive:    (lambda a, r: 1, ),
+    np.square:      (lambda a, r: 2*a, ),
+    np.sqrt:        (lambda a, r: 1/(2*r), ),
+    np.exp:         (lambda a, r: r, ),
+    np.log:         (lambda a, r: 1/a, ),
+    np.log10:       (lambda a, r: 1/(a*np.log(10)), ),
+    np.sin:         (lambda a, r: np.cos(a), ),
+    np.cos:         (lambda a, r: -np.sin(a), ),
+    np.tan:         (lambda a, r: 1 + r**2, ),
+    np.arcsin:      (lambda a, r: 1/np.sqrt(1 - a**2), ),
+    np.arccos:      (lambda a, r: -1/np.sqrt(1 - a**2), ),
+    np.arctan:      (lambda a, r: 1/(1 + a**2), ),
+    np.arctan2:     (lambda a, b, r: b/(a**2 + b**2), lambda a, b, r: -a/(a**2 + b**2)),
+    np.sinh:        (lambda a, r: np.cosh(a), ),
+    np.cosh:        (lambda a, r: np.sinh(a), ),
+    np.tanh:        (lambda a, r: 1 - r**2, ),
+    np.radians:     (lambda a, r: np.pi/180, ),
+    np.degrees:     (lambda a, r: 180/np.pi, ),
+}
+_DERIVADAS[np.deg2rad] = _DERIVADAS[np.radians]
+_DERIVADAS[np.rad2deg] = _DERIVADAS[np.degrees]
+
+# Ufuncs cuyo error no depende del resultado, pueden escribir el resultado sobre una de sus entradas
+_ERROR_SIN_RESULTADO = {np.add, np.subtract, np.multiply, np.true_divide}
+
+def _terminos_error(ufunc, entradas, valores, resultado):
+    '''Contribuciones al error (derivada parcial por error) de cada entrada que es una medida'''
+    terminos = []
+    for derivada, entrada in zip(_DERIVADAS[ufunc], entradas):
+        if isinstance(entrada, Medida):
+            d = derivada(*valores, resultado)
+            # Con derivada constante ±1 se evita crear un array nuevo
+            error = _mp(entrada._error)
+            terminos.append(error if type(d) is int and abs(d) == 1 else d*error)
+    return terminos
+
+def _cuadratura(terminos, out=None):
+    '''Suma en cuadratura de las contribuciones al error, opcionalmente escrita en out'''
+    if len(terminos) == 1:
+        return np.abs(terminos[0], out=out)
+    if all(np.asarray(t).dtype != object for t in terminos):
+        # hypot solo admite dos términos, con más se van añadiendo uno a uno
+        error = np.hypot(terminos[0], terminos[1], out=out)
+        for termino in terminos[2:]:
+            error = np.hypot(error, termino, out=out)
+        return error
+    error = np.sqrt(sum(t**2 for t in terminos))
+    if out is None:
+        return error
+    out[...] = error
+    return out
+
+# Ufuncs que solo dependen del valor de la medida y no devuelven una medida
+_UFUNCS_VALOR = {np.isnan, np.isinf, np.isfinite, np.sign, np.greater, np.greater_equal, np.less, np.less_equal,
+                 np.equal, np.not_equal}
+
+def _extremos_trigonometricos(ufunc, x, error_x, resultado, error):
+    '''
+    En los máximos y mínimos del seno y del coseno la derivada es nula, en esos puntos se toma como error lo que
+    varía la función al sumarle el error a x
+    '''
+    extremos = (resultado == 1) | (resultado == -1)
+    if np.any(extremos):
+        error[extremos] = np.abs(ufunc(x[extremos] + error_x[extremos]) - resultado[extremos])
+    return error
+
+_CORRECCIONES = {np.sin: _extremos_trigonometricos, np.cos: _extremos_trigonometricos}
+
+# Funciones de numpy (np.sum, np.mean, ...) implementadas para medidas
+_FUNCIONES_NUMPY = {}
+
+def _implementa(funcion_numpy):
+    '''Registra la implementación para medidas de una función de numpy'''
+    def decorador(funcion):
+        _FUNCIONES_NUMPY[funcion_numpy] = funcion
+        return funcion
+    return decorador
+
+def _a_float(valor, axis):
+    '''Estadístico como float, o como array de floats si se calculó a lo largo de un eje'''
+    return float(valor) if axis is None else np.asarray(valor).astype(float)[()]
+
 class Medida:
     """Objeto básico para guardar medidas. Se le puede dar una o varias medidas
     (en una lista) y sus respectivos errores"""
-    def __init__(self, medida: list[float] or float, error: list[float] or float = None, aproximar: bool = True):
+    def __init__(self, medida: list[float] or float, error: list[float] or float = None, aproximar: bool = True, backend: int = None):
         if not isinstance(medida, Medida):
+            backend = calculos.BACKEND if backend is None else backend
             error = 0 if error is None else error
             # Si no se pasa un iterable se convierte en uno
             if not hasattr(medida, '__iter__'):
                 medida = [medida]
             
-            self._medida = np.array([Number(i) for i in medida])
-            self._error  = _tratar_error(medida, error)
+            self._medida = _como_array(medida, backend)
+            self._error  = _tratar_error(self._medida, error, backend)
         else:
             medida = medida.copy()
+            if backend is not None:
+                medida.cambia_backend(backend)
             self._medida = medida._medida
             if error is None:
                 self._error = medida._error
             else:
-                self._error = _tratar_error(medida._medida, error)
+                self._error = _tratar_error(medida._medida, error, medida.backend)
+            # Una copia de una medida aproximada se sigue mostrando aproximada
+            aproximar = aproximar or medida._aproximar
                 
-                
-        if aproximar:
-            self.aprox()
+        # La aproximación no se hace al crear la medida sino al mostrarla (ver _representacion)
+        self._aproximar = aproximar
+        self._cache_aprox = None
+        self._version = [0]
         self.__print_style = self.Estilo.pm
 
     @classmethod
@@ -61,13 +199,178 @@ class Medida:
             raise TypeError(f"Expected pairs of numbers but at least one of them isnt")
         return self([i[0] for i in args], [i[1] for i in args], aproximar=aproximar)
 
+    @classmethod
+    def _desde_arrays(cls, medida, error):
+        '''
+            Crea una medida a partir de los arrays de valores y errores sin copiarlos ni pasar por __init__.
+            Si alguno de los dos es de precisión múltiple la medida se crea con ese backend
+        '''
+        nueva = object.__new__(cls)
+        medida = np.asarray(medida)
+        error = np.asarray(error)
+        if medida.dtype == object or error.dtype == object:
+            if medida.dtype != object:
+                medida = _como_array(medida, calculos.MULTIPRECISION)
+            if error.dtype != object:
+                error = _como_array(error, calculos.MULTIPRECISION)
+        else:
+            medida = medida.astype(float, copy=False)
+            error = error.astype(float, copy=False)
+        nueva._medida = medida
+        nueva._error = error
+        nueva._aproximar = False
+        nueva._cache_aprox = None
+        # Contador de modificaciones, compartido entre una medida y sus vistas
+        nueva._version = [0]
+        nueva.__print_style = cls.Estilo.pm
+        return nueva
+
+    @property
+    def backend(self) -> int:
+        """Backend con el que se guardan los valores (calculos.FLOAT64 o calculos.MULTIPRECISION)"""
+        return calculos.MULTIPRECISION if self._medida.dtype == object else calculos.FLOAT64
+
+    def cambia_backend(self, backend):
+        """Cambia el almacenamiento de la medida por el del backend dado. El paso de FLOAT64 a MULTIPRECISION
+        no pierde información, en el contrario se redondea cada valor al float más cercano"""
+        if backend not in (calculos.FLOAT64, calculos.MULTIPRECISION):
+            raise TypeError(f'El backend {backend} no es un backend válido')
+        if backend != self.backend:
+            self._medida = _como_array(self._medida, backend)
+            self._error = _como_array(self._error, backend)
+            self._cache_aprox = None
+            self._version = [0]
+        return self
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Forma de la medida, igual que la de un array de numpy"""
+        return self._medida.shape
+
+    @property
+    def ndim(self) -> int:
+        """Número de dimensiones de la medida"""
+        return self._medida.ndim
+
+    @property
+    def T(self):
+        """Medida transpuesta (vista)"""
+        return self.transpose()
+
+    def _vista(self, medida, error):
+        '''Crea una medida con los arrays dados (vistas de los de esta) que se muestra y se invalida igual que esta'''
+        vista = Medida._desde_arrays(medida, error)
+        vista._aproximar = self._aproximar
+        vista._version = self._version
+        vista.__print_style = self.__print_style
+        return vista
+
+    def reshape(self, *forma):
+        """Cambia la forma de la medida (igual que np.reshape). Siempre que sea posible devuelve una vista"""
+        return self._vista(self._medida.reshape(*forma), self._error.reshape(*forma))
+
+    def transpose(self, *ejes):
+        """Permuta los ejes de la medida (igual que np.transpose). Devuelve una vista"""
+        return self._vista(self._medida.transpose(*ejes), self._error.transpose(*ejes))
+
+    def _representacion(self):
+        '''
+            Devuelve los arrays de valores y errores tal y como se muestran. Si la medida se creó con aproximar=True
+            se aproximan la primera vez que se piden y se guardan hasta que se modifique la medida o alguna de sus vistas
+        '''
+        if not self._aproximar:
+            return self._medida, self._error
+        estado = (self._version[0], calculos.ROUND_MODE)
+        if self._cache_aprox is None or self._cache_aprox[0] != estado:
+            medida, error = aprox(self._medida, self._error)
+            backend = self.backend
+            self._cache_aprox = (estado, _como_array(medida, backend), _como_array(error, backend))
+        return self._cache_aprox[1], self._cache_aprox[2]
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        '''
+            Permite aplicar las ufuncs de numpy (np.sin(m), np.exp(m), m1 * m2...) propagando el error en cuadratura.
+            Las entradas que no son medidas se toman como valores sin error. Con out=medida el resultado se escribe
+            en los datos de esa medida en vez de crear una nueva
+        '''
+        # Las operaciones con una expresión perezosa dan otra expresión (ver Expresion.__array_ufunc__)
+        if any(isinstance(i, Expresion) for i in inputs):
+            return NotImplemented
+        salida = kwargs.pop('out', None)
+        if salida is not None:
+            if len(salida) != 1 or not isinstance(salida[0], Medida):
+                return NotImplemented
+            salida = salida[0]
+        multiprecision = any(isinstance(i, Medida) and i._medida.dtype == object for i in inputs)
+        valores = [i._medida if isinstance(i, Medida) else _sin_mpf(np.asarray(i), multiprecision) for i in inputs]
+        if any(v.dtype == object for v in valores):
+            valores = [_mp(v) for v in valores]
+        if method == 'reduce' and ufunc is np.add and salida is None:
+            return _sum(inputs[0], axis=kwargs.pop('axis', 0), **kwargs)
+        if method != '__call__':
+            return NotImplemented
+        if ufunc in _UFUNCS_VALOR and salida is None:
+            return ufunc(*valores, **kwargs)
+        if ufunc not in _DERIVADAS:
+            return NotImplemented
+        
+        # Si el error no depende del resultado y todo es float64 se escribe directamente en los arrays de salida
+        if (salida is not None and ufunc in _ERROR_SIN_RESULTADO and salida._medida.dtype != object
+                and all(v.dtype != object for v in valores)):
+            _cuadratura(_terminos_error(ufunc, inputs, valores, None), out=salida._error)
+            ufunc(*valores, out=salida._medida, **kwargs)
+            salida._version[0] += 1
+            return salida
+
+        resultado = ufunc(*valores, **kwargs)
+        error = _cuadratura(_terminos_error(ufunc, inputs, valores, resultado))
+        error = np.array(np.broadcast_to(error, np.shape(resultado)))
+        if ufunc in _CORRECCIONES:
+            error = _CORRECCIONES[ufunc](ufunc, valores[0], inputs[0]._error, resultado, error)
+        if salida is None:
+            return Medida._desde_arrays(resultado, error)
+
+        nueva = Medida._desde_arrays(resultado, error).cambia_backend(salida.backend)
+        salida._medida[...] = nueva._medida
+        salida._error[...] = nueva._error
+        salida._version[0] += 1
+        return salida
+
+    def _en_el_sitio(self, ufunc, other):
+        '''
+            Aplica ufunc(self, other) guardando el resultado en los datos de self. Si el resultado no cabe en self
+            (por tener otra forma o más precisión) se devuelve una medida nueva
+        '''
+        if isinstance(other, Medida):
+            valores = other._medida
+        else:
+            valores = _sin_mpf(np.asarray(other), self._medida.dtype == object)
+        cabe = np.broadcast_shapes(self._medida.shape, valores.shape) == self._medida.shape
+        if cabe and (self._medida.dtype == object or valores.dtype != object):
+            return ufunc(self, other, out=(self, ))
+        return ufunc(self, other)
+
+    def _mpmath_(self, prec, rounding):
+        # mpmath intenta convertir así los objetos al operarlos con un mpf (pysics.pi*m). Sin esto, antes de dejar la
+        # operación a la medida construye un mensaje de error con repr(medida), que formatea todos sus valores
+        raise TypeError('Una medida no se puede convertir en un número de mpmath')
+
+    def __array_function__(self, func, types, args, kwargs):
+        '''
+            Permite usar con medidas las funciones de numpy registradas con _implementa (np.sum, np.mean, np.dot,
+            np.concatenate...). El resto (np.max, np.shape, np.argsort...) se aplican a los valores de las medidas
+        '''
+        if func not in _FUNCIONES_NUMPY:
+            return func(*_valores(args), **_valores(kwargs))
+        return _FUNCIONES_NUMPY[func](*args, **kwargs)
+
     @property
     def medida(self):
-        return [float(i) for i in self._medida]
+        return self._medida.astype(float).tolist()
     
     @property
     def error(self):
-        return [float(i) for i in self._error]
+        return self._error.astype(float).tolist()
 
     def unpack(self) -> tuple[list[float], list[float]]:
         """Devuelve una tupla con la(s) medida(s) y su(s) error(es)"""
@@ -75,56 +378,97 @@ class Medida:
 
     def lista_de_medidas(self):
         """Devuelve una lista con los valores contenidos como medidas individuales"""
-        return [Medida(*i, aproximar=False).cambia_estilo(self.__print_style) for i in zip(self._medida, self._error)]
+        return [self[i].cambia_estilo(self.__print_style) for i in range(len(self))]
 
     def copy(self):
         """Retorna una copia INDEPENDIENTE de si misma. Todos los punteros a los datos son distintos"""
-        # los list son para hacer que las listas sean independientes
-        return Medida(list(self._medida), list(self._error), aproximar=False).cambia_estilo(self.__print_style)
+        copia = Medida._desde_arrays(self._medida.copy(), self._error.copy())
+        copia._aproximar = self._aproximar
+        return copia.cambia_estilo(self.__print_style)
 
     def aprox(self, decimales = None):
-        """Aproxima los valores de la medida"""
+        """Aproxima los valores guardados en la medida"""
+        backend = self.backend
         if decimales is None:
-            self._medida, self._error = aprox(self._medida, self._error)
+            medida, error = aprox(self._medida, self._error)
+        elif backend == calculos.FLOAT64:
+            medida = calculos.round(self._medida, decimales)
+            error = calculos.round(self._error, decimales)
         else:
-            self._medida = np.array([calculos.round(i, decimales) for i in self._medida])
-            self._error = np.array([calculos.round(i, decimales) for i in self._error])
+            redondeo = np.frompyfunc(lambda i: calculos.round(i, decimales), 1, 1)
+            medida = redondeo(self._medida)
+            error = redondeo(self._error)
+        self._medida = _como_array(medida, backend)
+        self._error = _como_array(error, backend)
+        self._aproximar = False
+        self._cache_aprox = None
+        self._version = [0]
             
         return self
 
-    def media(self) -> float:
-        """Calcula la media de los valores"""
-        return float(media(*self._medida))
+    def resumen(self, axis: int = None) -> Resumen:
+        """Resumen estadístico de los valores y errores (ver estadistica.Resumen), calculado en una sola pasada"""
+        return Resumen(axis).añade(self._medida, self._error)
 
-    def desviacion_estandar(self) -> float:
-        """Calcula la desviación estandar de los valores de la medida"""
-        return float(desviacion_estandar(*self._medida))
+    def media(self, axis: int = None) -> float:
+        """Calcula la media de los valores. Si se da un eje se calcula a lo largo de él y se devuelve un array"""
+        return _a_float(self.resumen(axis).media, axis)
 
-    def error_estandar(self) -> float:
-        """Calcula el error estandar de los valores de la medida (desviación estandar de la media)"""
-        return float(error_estandar(*self._medida))
+    def desviacion_estandar(self, axis: int = None) -> float:
+        """Calcula la desviación estandar de los valores de la medida. Si se da un eje se calcula a lo largo de él"""
+        return _a_float(self.resumen(axis).desviacion_estandar(), axis)
 
-    def estimacion(self):
-        """Calcula la media de los valores de la medida y estima el error comparando el error cuadratico medio y el error estandar y devuelve el mayor"""
-        error_cuadratico_medio = np.sqrt(np.sum(self._error**2))/len(self._error)
-        return Medida(self.media(), np.max([self.error_estandar(), error_cuadratico_medio]), aproximar = False)
+    def error_estandar(self, axis: int = None) -> float:
+        """Calcula el error estandar de los valores de la medida (desviación estandar de la media). Si se da un eje
+        se calcula a lo largo de él"""
+        return _a_float(self.resumen(axis).error_estandar(), axis)
+
+    def estimacion(self, axis: int = None):
+        """Calcula la media de los valores de la medida y estima el error comparando el error cuadratico medio y el error estandar y devuelve el mayor.
+        Si se da un eje se hace a lo largo de él y se devuelve una medida con una estimación por cada posición del resto de ejes"""
+        media, error = self.resumen(axis).estimacion()
+        return Medida(_a_float(media, axis), _a_float(error, axis), aproximar = False, backend = self.backend)
     
+    def agrupa(self, claves, pesado: bool = True):
+        """
+        Combina los valores de la medida que tienen la misma clave (array de la misma longitud) con la media pesada
+        por el inverso de la varianza (o la estimación si pesado=False), ver estadistica.agrupa
+
+        Returns:
+            tuple[np.ndarray, Medida, np.ndarray]: (claves sin repetir ordenadas, medida con un valor por grupo,
+            número de valores de cada grupo)
+        """
+        unicas, media, error, cuentas = agrupa(self._medida, self._error, claves, pesado)
+        return unicas, Medida._desde_arrays(media, error), cuentas
+
+    def movil(self, ventana: int, operacion: str = 'media', modo: str = 'igual'):
+        """
+        Operación en una ventana móvil de ventana puntos sobre los valores de la medida (como serie plana):
+        'suma', 'media', 'media_pesada', 'maximo' y 'minimo' devuelven una medida con el error propagado y
+        'desviacion' un array. Con modo 'igual' hay un resultado por punto y con 'valido' solo las ventanas
+        completas. El coste no depende del tamaño de la ventana, salvo en 'desviacion' que crece con su logaritmo
+        (ver estadistica.suma_movil y desviacion_movil)
+        """
+        funcion = getattr(estadistica, f'{operacion}_movil', None)
+        if funcion is None:
+            raise ValueError(f'La operación {operacion} no es válida')
+        return funcion(self, ventana, modo)
+
     def rad(self):
         '''Convierte a radianes desde grados'''
-        m = [n.rad() for n in self._medida]
-        e = [g.rad() for g in self._error]
-        return Medida(m, e, aproximar=False)
+        return Medida._desde_arrays(np.radians(_mp(self._medida)), np.radians(_mp(self._error)))
     
     def grad(self):
         '''Convierte a grados desde radianes'''
-        m = [n.grad() for n in self._medida]
-        e = [g.grad() for g in self._error]
-        return Medida(m, e, aproximar=False)
+        return Medida._desde_arrays(np.degrees(_mp(self._medida)), np.degrees(_mp(self._error)))
 
     def sqrt(self):
-        m = np.array([m.sqrt() for m in self._medida])
-        e = 1/(2*m)*self._error
-        return Medida(m, e, aproximar=False)
+        return np.sqrt(self)
+
+    def perezosa(self):
+        """Devuelve la medida como expresión perezosa: las operaciones con ella no se calculan hasta llamar a
+        evalua(), que lo hace de una vez y propaga bien el error si la misma medida aparece varias veces"""
+        return Expresion(self)
 
     def cambia_estilo(self, estilo):
         """Cambia el estilo actual por otro"""
@@ -138,113 +482,104 @@ class Medida:
         """Clase conteninendo las diferentes funciones que representan la clase medida"""
         def lista(self):
             """[medidas] ± [errores]"""
-            if len(self._medida) == 1:
-                m = self._medida[0]
-                e = self._error[0]
+            medida, error = self._representacion()
+            if medida.size == 1:
+                m = _formato(medida.flat[0])
+                e = _formato(error.flat[0])
             else:
-                m = [str(i) for i in self._medida]
-                e = [str(i) for i in self._error]
+                m = _formatos(medida)
+                e = _formatos(error)
             return f'{m} ± {e}'
 
         def pm(self):
             """medida 1 ± error 1, medida2 ± error 2, ..."""
-            l = []
-            for m, e in zip(self._medida, self._error):
-                l.append(f'{m} ± {e}')
-            return ', '.join(l)
+            return _pm(*self._representacion())
         
         def a(self):
             return 'datos'
 
         def tabla(self):
             """Igual que pm pero solo funciona con una medida de longitud 1 por razones de debug"""
-            if len(self._medida) == 1:
-                m = self._medida[0]
-                e = self._error[0]
+            medida, error = self._representacion()
+            if medida.size == 1:
+                m = _formato(medida.flat[0])
+                e = error.flat[0]
                 if e == 0:
                     return str(m)
-                return f'{m} ± {e}'
+                return f'{m} ± {_formato(e)}'
             else:
                 raise ValueError('La medida solo debe contener un valor para emplear el estilo "tabla"')
 
         def tabla_latex(self):
             """Igual que tabla pero en math mode"""
-            if len(self._medida) == 1:
-                m = self._medida[0]
-                e = self._error[0]
+            medida, error = self._representacion()
+            if medida.size == 1:
+                m = _formato(medida.flat[0])
+                e = error.flat[0]
                 if e == 0:
                     return "$" + str(m)+ "$"
-                return f'${m} ' +  r"\pm" + f' {e}$'
+                return f'${m} ' +  r"\pm" + f' {_formato(e)}$'
             else:
                 raise ValueError('La medida solo debe contener un valor para emplear el estilo "tabla"')
             
         def tabla_typst(self):
             """Igual que tabla pero en math mode"""
-            if len(self._medida) == 1:
-                m = self._medida[0]
-                e = self._error[0]
+            medida, error = self._representacion()
+            if medida.size == 1:
+                m = _formato(medida.flat[0])
+                e = error.flat[0]
                 if e == 0:
                     return "$" + str(m)+ "$"
-                return f'${m} ' +  r"plus.minus" + f' {e}$'
+                return f'${m} ' +  r"plus.minus" + f' {_formato(e)}$'
             else:
                 raise ValueError('La medida solo debe contener un valor para emplear el estilo "tabla"')
 
 # -----------------------------------------------------------------------------
     def __abs__(self):
-        return Medida(abs(self._medida), self._error)
+        return Medida(abs(self._medida), self._error, backend = self.backend)
     
     
     def __add__(self, other):
-        if not isinstance(other, Medida):
-            other = Medida(other)
-        return Medida(self._medida + other._medida, np.sqrt(self._error**2 + other._error**2), aproximar = False)
+        return np.add(self, other)
 
     def __radd__(self, other):
-        return self + other
+        return np.add(other, self)
 
     def __sub__(self, other):
-        if not isinstance(other, Medida):
-            other = Medida(other)
-        return Medida(self._medida - other._medida, np.sqrt(self._error**2 + other._error**2), aproximar = False)
+        return np.subtract(self, other)
 
     def __rsub__(self, other):
-        return -self + other
+        return np.subtract(other, self)
 
     def __mul__(self, other):
-        # Si es un escalar
-        if not isinstance(other, Medida):
-            medida = self._medida * other
-            error = self._error * abs(other)
-        else:
-            medida = self._medida*other._medida
-            error = np.sqrt(np.array( (other._medida * self._error)**2 + (self._medida * other._error)**2 ))
-
-        return Medida(medida, error, aproximar = False)
+        return np.multiply(self, other)
 
     def __rmul__(self, val):
-        return Medida(val * self._medida, abs(val) * self._error, aproximar = False)
+        return np.multiply(val, self)
 
     def __truediv__(self, other):
-        # Si es un escalar
-        if not isinstance(other, Medida):
-            medida = self._medida/other
-            error = self._error/abs(other)
-        else:
-            medida = self._medida/other._medida
-            error = np.sqrt(np.array( (1/other._medida * self._error)**2
-                            + (self._medida/other._medida**2 * other._error)**2 ))
-        return Medida(medida, error, aproximar = False)
+        return np.true_divide(self, other)
 
     def __rtruediv__(self, other):
-        return Medida(other/self._medida, abs(other/self._medida**2) * self._error, aproximar = False)
+        return np.true_divide(other, self)
 
     def __pow__(self, other):
-        medida = self._medida**other
-        error = abs((other)*self._medida**(other-1))*self._error
-        return Medida(medida, error, aproximar = False)
+        return np.power(self, other)
+
+    def __iadd__(self, other):
+        return self._en_el_sitio(np.add, other)
+
+    def __isub__(self, other):
+        return self._en_el_sitio(np.subtract, other)
+
+    def __imul__(self, other):
+        return self._en_el_sitio(np.multiply, other)
+
+    def __itruediv__(self, other):
+        return self._en_el_sitio(np.true_divide, other)
 
     def __and__(self, other):
-        return Medida(self._medida + other._medida, self._error + other._error, aproximar = False)
+        return Medida._desde_arrays(self._medida + other._medida, self._error + other._error)
 
     def __or__(self, other):
         return self & -other
@@ -258,58 +593,58 @@ class Medida:
         return len(self._medida)
 
     def __getitem__(self, index):
-        if not hasattr(index, '__getitem__'):
-            return Medida(self._medida[index], self._error[index], aproximar=False)
-        
-        indice_deseado = index[0]
-        valor_o_error = index[1]
-        if valor_o_error is VALOR:
-            return self._medida[indice_deseado]
-        elif valor_o_error is ERROR:
+        '''
+            m[i, VALOR] y m[i, ERROR] devuelven los valores o errores. Cualquier otro índice de numpy devuelve una medida.
+            Con slices la medida nueva es una vista que comparte los datos con la original (no se copia nada); si el
+            índice tiene enteros, máscaras o listas de índices los datos se copian. Para obtener una medida
+            independiente usar copy()
+        '''
+        if _indica_valor_o_error(index):
+            indice_deseado, valor_o_error = index
+            if valor_o_error is VALOR:
+                return self._medida[indice_deseado]
             return self._error[indice_deseado]
-        raise TypeError("El valor del índice contiene algo que no es ni un valor ni un error")    
+
+        if not isinstance(index, tuple):
+            index = (index, )
+        enteros = [isinstance(i, (int, np.integer)) for i in index]
+        # Un solo elemento se devuelve como una medida de longitud 1
+        if len(index) == self.ndim and all(enteros):
+            index = index + (np.newaxis, )
+        if any(enteros):
+            # Los elementos sueltos se copian, como los escalares de numpy: con los operadores en el sitio una vista
+            # haría que total = m[0]; total += m[1] modificase m
+            copia = Medida._desde_arrays(self._medida[index].copy(), self._error[index].copy())
+            copia._aproximar = self._aproximar
+            copia.__print_style = Medida.Estilo.pm
+            return copia
+        vista = self._vista(self._medida[index], self._error[index])
+        vista.__print_style = Medida.Estilo.pm
+        return vista
     
     def __setitem__(self, index, value):
-        if hasattr(index, "__getitem__"):
-            indice = index[0]
-            valor_o_error = index[1]
-            value = Medida(value)
-            if type(indice) == slice:
-                if valor_o_error is VALOR:
-                    self._medida[indice] = value._medida
-                elif valor_o_error is ERROR:
-                    self._error[indice] = value._medida
-                else: raise Exception("No se ha especificado si se debe actualizar medida o error")
-                if len(self._medida) != len(self._error):
-                    raise TypeError("El valor nuevo no llena todos los datos anteriores")
+        # Invalida la aproximación guardada de esta medida y de todas las vistas que comparten sus datos
+        self._version[0] += 1
+        if _indica_valor_o_error(index):
+            indice, valor_o_error = index
+            value = Medida(value, backend = self.backend)
+            destino = self._medida if valor_o_error is VALOR else self._error
+            if isinstance(indice, (int, np.integer)):
+                destino[indice] = value._medida[0]
             else:
-                if valor_o_error is VALOR:
-                    self._medida[indice] = value._medida[0]
-                elif valor_o_error is ERROR:
-                    self._error[indice] = value._medida[0]
-                else: raise Exception("No se ha especificado si se debe actualizar medida o error")
-                if len(self._medida) != len(self._error):
-                    raise TypeError("El valor nuevo no llena todos los datos anteriores")
+                destino[indice] = value._medida
         else:
-            if type(index) == slice:
-                if isinstance(value, Medida):
-                    self._medida[index] = value._medida
-                    self._error[index] = value._error
-                if hasattr(value, "__getitem__"):
-                    value = Medida(value[0], value[1])
-                    self._medida[index] = value._medida
-                    self._error[index] = value._error
+            if not isinstance(value, Medida) and hasattr(value, "__getitem__"):
+                value = Medida(value[0], value[1], backend = self.backend)
+            if isinstance(index, (int, np.integer)):
+                self._medida[index] = value._medida[0]
+                self._error[index] = value._error[0]
             else:
-                if isinstance(value, Medida):
-                    self._medida[index] = value._medida[0]
-                    self._error[index] = value._error[0]
-                if hasattr(value, "__getitem__"):
-                    value = Medida(value[0], value[1])
-                    self._medida[index] = value._medida[0]
-                    self._error[index] = value._error[0]
+                self._medida[index] = value._medida
+                self._error[index] = value._error
             
     def __neg__(self):
-        return (-1)*self.copy()
+        return np.negative(self)
 
     def __str__(self):
         return self.__print_style(self)
@@ -318,7 +653,80 @@ class Medida:
         return "Medida( " + str(self) + " )"
     
     def __iter__(self):
-        return (float(i) for i in self.medida)
+        return iter(self.medida)
+
+
+def _como_medida(x):
+    return x if isinstance(x, Medida) else Medida._desde_arrays(np.asarray(x), np.zeros(np.shape(x)))
+
+def _valores(objeto):
+    '''Sustituye las medidas por sus valores, también dentro de listas, tuplas y diccionarios'''
+    if isinstance(objeto, Medida):
+        return objeto._medida
+    if isinstance(objeto, (list, tuple)):
+        return type(objeto)(_valores(i) for i in objeto)
+    if isinstance(objeto, dict):
+        return {clave: _valores(valor) for clave, valor in objeto.items()}
+    return objeto
+
+def _arrays_medidas(medidas):
+    '''Valores y errores (con la forma de los valores) de varias medidas, con el mismo backend'''
+    medidas = [_como_medida(m) for m in medidas]
+    if any(m.backend == calculos.MULTIPRECISION for m in medidas):
+        medidas = [m.copy().cambia_backend(calculos.MULTIPRECISION) for m in medidas]
+    return [m._medida for m in medidas], [np.broadcast_to(m._error, m.shape) for m in medidas]
+
+@_implementa(np.sum)
+def _sum(a, axis=None, dtype=None, out=None, keepdims=False):
+    '''Suma de los valores de una medida, el error es la suma en cuadratura de los errores'''
+    if dtype is not None or out is not None:
+        raise TypeError('La suma de medidas no admite los argumentos dtype ni out')
+    a = _como_medida(a)
+    medida = np.sum(a._medida, axis=axis, keepdims=keepdims)
+    error = np.sqrt(np.sum(a._error**2, axis=axis, keepdims=keepdims))
+    return Medida._desde_arrays(np.array(medida, ndmin=1), np.array(error, ndmin=1))
+
+@_implementa(np.mean)
+def _mean(a, axis=None, dtype=None, out=None, keepdims=False):
+    '''Media de los valores de una medida con el error propagado de los errores de cada valor'''
+    a = _como_medida(a)
+    n = np.size(a._medida) if axis is None else np.shape(a._medida)[axis]
+    return _sum(a, axis=axis, dtype=dtype, out=out, keepdims=keepdims) / n
+
+@_implementa(np.reshape)
+def _reshape(a, *args, **kwargs):
+    return a.reshape(*args, **kwargs)
+
+@_implementa(np.transpose)
+def _transpose(a, axes=None):
+    return a.transpose() if axes is None else a.transpose(*axes)
+
+@_implementa(np.concatenate)
+def _concatenate(medidas, axis=0, out=None):
+    '''Une medidas a lo largo de un eje existente, con sus errores'''
+    if out is not None:
+        raise TypeError('La concatenación de medidas no admite el argumento out')
+    valores, errores = _arrays_medidas(medidas)
+    return Medida._desde_arrays(np.concatenate(valores, axis=axis), np.concatenate(errores, axis=axis))
+
+@_implementa(np.stack)
+def _stack(medidas, axis=0, out=None):
+    '''Une medidas de la misma forma a lo largo de un eje nuevo, con sus errores'''
+    if out is not None:
+        raise TypeError('La unión de medidas no admite el argumento out')
+    valores, errores = _arrays_medidas(medidas)
+    return Medida._desde_arrays(np.stack(valores, axis=axis), np.stack(errores, axis=axis))
+
+@_implementa(np.dot)
+def _dot(a, b, out=None):
+    '''Producto escalar (o de matrices) de medidas. Los errores se propagan en cuadratura'''
+    if out is not None:
+        raise TypeError('El producto de medidas no admite el argumento out')
+    a = _como_medida(a)
+    b = _como_medida(b)
+    medida = np.dot(a._medida, b._medida)
+    error = np.sqrt(np.dot(a._error**2, b._medida**2) + np.dot(a._medida**2, b._error**2))
+    return Medida._desde_arrays(np.array(medida, ndmin=1), np.array(error, ndmin=1))
 
 
 class Recta:
@@ -365,26 +773,79 @@ class Recta:
 
     def __repr__(self):
         return f'Recta( {self} )'
+
+
+class Rectas:
+    '''Conjunto de rectas ajustadas a la vez (ver ajuste.minimos_cuadrados_lote). pendiente y n_0 son medidas con un
+    valor por recta, rectas[i] devuelve la Recta i y rectas[i:j] otro conjunto de rectas'''
+    def __init__(self, pendiente, n_0, x=None, mascara=None):
+        self.pendiente = pendiente if isinstance(pendiente, Medida) else Medida(pendiente, aproximar=False)
+        self.n_0 = n_0 if isinstance(n_0, Medida) else Medida(n_0, aproximar=False)
+        # Puntos x de cada recta (una fila por recta) y cuáles se usaron en el ajuste
+        self.x = x
+        self.mascara = mascara
+
+    def aprox(self):
+        self.pendiente.aprox()
+        self.n_0.aprox()
+        return self
+
+    def evalua(self, x) -> np.ndarray:
+        """Valor de cada recta en los puntos x (los mismos para todas o una fila por recta), una fila por recta"""
+        return self.pendiente._medida[:, np.newaxis]*np.asarray(x) + self.n_0._medida[:, np.newaxis]
+
+    def __len__(self):
+        return len(self.pendiente)
+
+    def __getitem__(self, index):
+        x = None if self.x is None else self.x[index]
+        mascara = None if self.mascara is None else self.mascara[index]
+        if isinstance(index, slice):
+            return Rectas(self.pendiente[index], self.n_0[index], x, mascara)
+        if x is None:
+            x = []
+        elif mascara is not None:
+            x = x[mascara]
+        return Recta(self.pendiente[index], self.n_0[index], x)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __str__(self):
+        return '\n'.join(str(recta) for recta in self)
+
+    def __repr__(self):
+        return f'Rectas( {len(self)} rectas )'
     
 class Number:
-    def __init__(self, value):
-        if isinstance(value, Number):
-            self.value = value.value
+    # Sin __dict__: en un array de objetos cada elemento es solo la referencia a su mpf
+    __slots__ = ('value', )
+
+    def __new__(cls, value):
+        tipo = type(value)
+        # Camino rápido: los float e int se reutilizan de una caché (0, 1, errores constantes...)
+        if cls is Number and (tipo is float or tipo is int):
+            return _number_interno(value, mpmath.mp.prec)
+        numero = object.__new__(cls)
+        if isinstance(value, mpmath.mpf):
+            numero.value = value
+        elif isinstance(value, Number):
+            numero.value = value.value
         elif isinstance(value, (int, float)):
-            value = str(value)
-            self.value = mpmath.mpf(value)
+            numero.value = mpmath.mpf(str(value))
         elif isinstance(value, str):
-            self.value = mpmath.mpf(value)
-        elif isinstance(value, mpmath.mpf):
-            self.value = value
+            numero.value = mpmath.mpf(value)
         elif type(value) == type(mpmath.mp.pi):
-            self.value = mpmath.mpf(value)
-        elif type(value).__module__ == np.__name__:
-            value = float(value)
-            self.value = mpmath.mpf(str(value))
+            numero.value = mpmath.mpf(value)
+        elif tipo.__module__ == np.__name__:
+            return cls(float(value)) if cls is Number else cls(str(float(value)))
         elif isinstance(value, mpmath.mpc):
             raise TypeError("Un número complejo salvaje ha aparecido, algo ha ido mal :/")
         else: raise TypeError(f"Value not suported : {type(value)}")
+        return numero
+
+    def __reduce__(self):
+        return (type(self), (self.value, ))
     
     def sqrt(self):
         return Number(self.value.sqrt())
@@ -531,6 +992,43 @@ class Number:
         return f"Number({mpmath.nstr(self.value, mpmath.mp.dps, min_fixed=-4, max_fixed=5)})"
 
 
+@lru_cache(maxsize=4096)
+def _number_interno(value, prec):
+    '''
+    Number de un float o int. Equivale a mpf(str(value)) a la precisión actual (que forma parte de la clave de la
+    caché). Los Number no se modifican nunca, así que el mismo objeto se puede compartir entre todos los elementos
+    '''
+    numero = object.__new__(Number)
+    if type(value) is int:
+        numero.value = mpmath.mp.make_mpf(from_int(value, prec, 'n'))
+    else:
+        numero.value = mpmath.mp.make_mpf(from_str(repr(value), prec, 'n'))
+    return numero
+
+# Convierte cada elemento de un array de objetos en un Number
+_a_number = np.frompyfunc(Number, 1, 1)
+
+# Al final porque precision necesita Number
+from .precision import ArrayMP
+
+def _sin_mpf(valores: np.ndarray, multiprecision: bool) -> np.ndarray:
+    '''
+    Los escalares de mpmath o Number (como pysics.pi) que no son medidas se pasan a float si ninguna medida de la
+    operación es de precisión múltiple: una constante no lleva toda la operación a precisión múltiple, que es mucho
+    más lenta. Los arrays de Number sí la llevan
+    '''
+    if valores.dtype == object and valores.ndim == 0 and not multiprecision:
+        return np.asarray(float(valores[()]))
+    return valores
+
+def _mp(array):
+    '''Los arrays de Number se operan como ArrayMP (ufuncs de precisión múltiple sobre todo el array)'''
+    return array.view(ArrayMP) if array.dtype == object else array
+
+# Al final porque expresion necesita Medida y _mp
+from .expresion import Expresion
+
+
 if __name__ == '__main__':
     # pass
     print()
@@ -0,0 +1,127 @@
+'''
+Operaciones de precisión múltiple sobre arrays enteros de Number.
+
+Las ufuncs de numpy sobre arrays de objetos llaman a un método de Number por elemento, y cada llamada comprueba tipos
+y pasa por las funciones de alto nivel de mpmath. Aquí cada ufunc se hace en una sola pasada sobre todo el array con
+las funciones de mpmath.libmp (que usan gmpy2 si está instalado), con la misma precisión que los métodos de Number:
+mp.prec+2 para las operaciones aritméticas y trigonométricas y mp.prec para el resto (ver calculos.set_precision)
+'''
+from itertools import repeat
+import numpy as np
+import mpmath
+from mpmath.libmp import (ComplexResult, from_int, mpf_add, mpf_sub, mpf_mul, mpf_div, mpf_pow, mpf_pos, mpf_neg,
+                          mpf_abs, mpf_sqrt, mpf_exp, mpf_log, mpf_sin, mpf_cos, mpf_tan, mpf_asin, mpf_acos,
+                          mpf_atan, mpf_atan2, mpf_sinh, mpf_cosh, mpf_tanh, mpf_degree)
+from .objetos import Number, _a_number
+
+_DIEZ = from_int(10)
+
+def _log10(x, prec, rnd):
+    # Igual que mpmath.log10: los dos logaritmos con 20 bits más y la división a la precisión pedida
+    return mpf_div(mpf_log(x, prec + 20, rnd), mpf_log(_DIEZ, prec + 20, rnd), prec, rnd)
+
+def _radianes(x, prec, rnd):
+    return mpf_mul(x, mpf_degree(prec, rnd), prec, rnd)
+
+def _grados(x, prec, rnd):
+    return mpf_div(x, mpf_degree(prec, rnd), prec, rnd)
+
+def _cuadrado(x, prec, rnd):
+    return mpf_mul(x, x, prec, rnd)
+
+# ufunc: (función de libmp, bits extra sobre mp.prec)
+_KERNELS = {
+    np.add:         (mpf_add, 2),
+    np.subtract:    (mpf_sub, 2),
+    np.multiply:    (mpf_mul, 2),
+    np.true_divide: (mpf_div, 2),
+    np.power:       (mpf_pow, 0),
+    np.positive:    (mpf_pos, 0),
+    np.negative:    (mpf_neg, 0),
+    np.absolute:    (mpf_abs, 0),
+    np.square:      (_cuadrado, 2),
+    np.sqrt:        (mpf_sqrt, 0),
+    np.exp:         (mpf_exp, 0),
+    np.log:         (mpf_log, 0),
+    np.log10:       (_log10, 0),
+    np.sin:         (mpf_sin, 2),
+    np.cos:         (mpf_cos, 2),
+    np.tan:         (mpf_tan, 2),
+    np.arcsin:      (mpf_asin, 2),
+    np.arccos:      (mpf_acos, 2),
+    np.arctan:      (mpf_atan, 2),
+    np.arctan2:     (mpf_atan2, 2),
+    np.sinh:        (mpf_sinh, 2),
+    np.cosh:        (mpf_cosh, 2),
+    np.tanh:        (mpf_tanh, 2),
+    np.radians:     (_radianes, 0),
+    np.degrees:     (_grados, 0),
+}
+_KERNELS[np.deg2rad] = _KERNELS[np.radians]
+_KERNELS[np.rad2deg] = _KERNELS[np.degrees]
+
+def _mpfs(array, forma):
+    '''Valores internos de mpmath (tuplas _mpf_) de un array extendido a la forma dada, en orden C'''
+    array = np.asarray(array)
+    if array.dtype != object:
+        array = np.asarray(_a_number(array), dtype=object)
+    if array.size == 1 and forma != array.shape:
+        return repeat(Number(array.flat[0]).value._mpf_)
+    elementos = np.broadcast_to(array, forma).ravel().tolist()
+    try:
+        return [n.value._mpf_ for n in elementos]
+    except AttributeError:
+        # Array de objetos con algo que no es un Number (int, float, mpf...)
+        return [Number(n).value._mpf_ for n in elementos]
+
+def _a_numbers(mpfs, forma):
+    '''Array de Number con la forma dada a partir de una lista de tuplas _mpf_'''
+    nuevo = object.__new__
+    mpf = mpmath.mp.mpf
+    numeros = np.empty(len(mpfs), dtype=object)
+    for i, valor in enumerate(mpfs):
+        numero = nuevo(Number)
+        numero.value = v = nuevo(mpf)
+        v._mpf_ = valor
+        numeros[i] = numero
+    return numeros.reshape(forma)
+
+def aplica(ufunc, *entradas):
+    '''
+    Aplica la ufunc a los arrays de entrada (de Number o de números normales) de una vez y devuelve un array de
+    Number. Da el mismo resultado que la ufunc de numpy sobre los Number. Lanza ComplexResult si algún resultado no
+    es real y KeyError si la ufunc no está implementada
+    '''
+    funcion, extra = _KERNELS[ufunc]
+    prec = mpmath.mp.prec + extra
+    rnd = mpmath.mp.rounding
+    forma = np.broadcast_shapes(*(np.shape(e) for e in entradas))
+    if len(entradas) == 1:
+        resultado = [funcion(x, prec, rnd) for x in _mpfs(entradas[0], forma)]
+    else:
+        x, y = (_mpfs(e, forma) for e in entradas)
+        resultado = [funcion(a, b, prec, rnd) for a, b in zip(x, y)]
+    return _a_numbers(resultado, forma)
+
+
+class ArrayMP(np.ndarray):
+    """
+    Array de Number (dtype object) en el que las ufuncs de _KERNELS se calculan con aplica() sobre todo el array.
+    El resto de ufuncs, o las que dan un resultado complejo, se hacen como en un array de objetos normal
+    """
+    def __new__(cls, valores):
+        valores = np.asarray(valores)
+        if valores.dtype != object:
+            valores = np.asarray(_a_number(valores), dtype=object)
+        return valores.view(cls)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method == '__call__' and not kwargs and ufunc in _KERNELS:
+            try:
+                return aplica(ufunc, *inputs).view(ArrayMP)
+            except ComplexResult:
+                pass
+        inputs = [i.view(np.ndarray) if isinstance(i, ArrayMP) else i for i in inputs]
+        if 'out' in kwargs:
+            kwargs['out'] = tuple(o.view(np.ndarray) if isinstance(o, ArrayMP) else o for o in kwargs['out'])
+        return getattr(ufunc, method)(*inputs, **kwargs)
@@ -0,0 +1,96 @@
+'''
+Incertidumbre de los parámetros de un ajuste por remuestreo, útil cuando los residuos no son gaussianos.
+Todas las réplicas se generan a la vez como un array con un generador con semilla (los resultados son reproducibles):
+    bootstrap: cada réplica toma n puntos al azar (con repetición) de los datos
+    montecarlo: cada réplica suma a y un ruido gaussiano de su error
+Las réplicas de rectas se ajustan todas a la vez (ver ajuste.minimos_cuadrados_lote) y las de curvas se reparten
+entre procesos (ver ajuste.curva_paralela). Cada parámetro se devuelve como una medida cuyo valor es el centro del
+intervalo de percentiles con la confianza pedida y su error la mitad de la anchura del intervalo
+'''
+import numpy as np
+from .objetos import Medida
+from .type_alias import elementos, Opcional
+from .ajuste import _estadisticos, _prepara_curva, _ajusta_conjuntos, _valores
+
+BOOTSTRAP = 'bootstrap'
+MONTECARLO = 'montecarlo'
+
+# Máximo de valores (réplicas x puntos) que se generan a la vez, para no llenar la memoria con muchos puntos
+_TAMAÑO_BLOQUE = 2**22
+
+def _replicas(rng, metodo, x, y, sigma, replicas):
+    '''Arrays (réplicas, puntos) de x, y y sigma de un bloque de réplicas'''
+    if metodo == BOOTSTRAP:
+        indices = rng.integers(0, y.size, size=(replicas, y.size))
+        return x[indices], y[indices], None if sigma is None else sigma[indices]
+    if metodo == MONTECARLO:
+        y = y + rng.standard_normal((replicas, y.size))*sigma
+        return np.broadcast_to(x, y.shape), y, None if sigma is None else np.broadcast_to(sigma, y.shape)
+    raise ValueError(f'El método {metodo} no es válido, debe ser remuestreo.BOOTSTRAP o remuestreo.MONTECARLO')
+
+def _intervalos(parametros, confianza, aproximar):
+    '''Medida (centro ± semianchura) del intervalo de percentiles de cada columna de parámetros'''
+    bajo, alto = np.nanpercentile(parametros, [50*(1 - confianza), 50*(1 + confianza)], axis=0)
+    return tuple(Medida((a + b)/2, (b - a)/2, aproximar=aproximar) for a, b in zip(bajo, alto))
+
+def recta(x: elementos, y: elementos, yerr: Opcional[[float, ...]] = None, pesado: bool = False,
+          metodo: str = BOOTSTRAP, replicas: int = 1000, confianza: float = 0.6827, semilla: int = None,
+          aproximar: bool = False, devolver_replicas: bool = False):
+    """
+    Pendiente y ordenada en el origen de la recta de mínimos cuadrados (pesados si pesado=True) con sus errores por
+    remuestreo. En montecarlo el ruido usa yerr o el error de y; si no hay, la desviación de los puntos a la recta
+
+    Returns:
+        tuple[Medida, Medida]: (pendiente, ordenada en el origen), y con devolver_replicas el array (réplicas, 2)
+        con los parámetros de cada réplica
+    """
+    if isinstance(y, Medida) and yerr is None and (pesado or np.any(y._error != 0)):
+        yerr = y._error
+    x, y = _valores(x), _valores(y)
+    sigma = None if yerr is None else np.broadcast_to(_valores(yerr), y.shape)
+    if metodo == MONTECARLO and sigma is None:
+        sigma = np.full(y.shape, _estadisticos(x, y).sigma_y())
+    if pesado and sigma is None:
+        raise TypeError('El ajuste pesado necesita los errores de y: pasa yerr o una Medida como y')
+
+    rng = np.random.default_rng(semilla)
+    parametros = np.empty((replicas, 2))
+    paso = max(1, _TAMAÑO_BLOQUE//y.size)
+    for inicio in range(0, replicas, paso):
+        n = min(paso, replicas - inicio)
+        rx, ry, rs = _replicas(rng, metodo, x, y, sigma, n)
+        e = _estadisticos(rx, ry, rs, pesado=pesado, lote=True)
+        parametros[inicio:inicio + n, 0] = e.pendiente()
+        parametros[inicio:inicio + n, 1] = e.ordenada()
+    intervalos = _intervalos(parametros, confianza, aproximar)
+    return (intervalos, parametros) if devolver_replicas else intervalos
+
+def curva(funcion, x: elementos, y: elementos, sigma = None, initial_guess: list[float] = None,
+          metodo: str = BOOTSTRAP, replicas: int = 1000, confianza: float = 0.6827, semilla: int = None,
+          procesos: int = None, aproximar: bool = False, devolver_replicas: bool = False):
+    """
+    Parámetros de ajuste.curva (mismos argumentos) con sus errores por remuestreo. Las réplicas se ajustan en
+    paralelo con hasta procesos procesos y empiezan en el ajuste de los datos originales. Las réplicas cuyo ajuste
+    no converge se descartan (quedan como nan con devolver_replicas). En montecarlo hacen falta los errores de y
+
+    Returns:
+        tuple[Medida, ...]: los parámetros, y con devolver_replicas el array (réplicas, parámetros)
+    """
+    x, y, sigma, initial_guess = _prepara_curva(funcion, x, y, sigma, initial_guess)
+    x, y = _valores(x), _valores(y)
+    if sigma is not None:
+        sigma = np.broadcast_to(_valores(sigma), y.shape)
+    elif metodo == MONTECARLO:
+        raise TypeError('El remuestreo montecarlo necesita los errores de y: pasa sigma=True con una Medida o sigma')
+    # Todas las réplicas empiezan en el ajuste de los datos originales
+    original, _ = _ajusta_conjuntos(funcion, [(0, x, y, sigma)], initial_guess, 1)[0]
+
+    rng = np.random.default_rng(semilla)
+    rx, ry, rs = _replicas(rng, metodo, x, y, sigma, replicas)
+    datos = [(i, rx[i], ry[i], None if rs is None else rs[i]) for i in range(replicas)]
+    parametros = np.full((replicas, len(original)), np.nan)
+    for i, ajuste in enumerate(_ajusta_conjuntos(funcion, datos, original, procesos, tolerante=True)):
+        if ajuste is not None:
+            parametros[i] = ajuste[0]
+    intervalos = _intervalos(parametros, confianza, aproximar)
+    return (intervalos, parametros) if devolver_replicas else intervalos
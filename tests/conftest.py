@@ -0,0 +1,15 @@
+'''
+El repositorio es el propio paquete, por lo que se carga como pysics para que las pruebas puedan importarlo
+'''
+import importlib.util
+import pathlib
+import sys
+
+_RAIZ = pathlib.Path(__file__).resolve().parent.parent
+
+if 'pysics' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location('pysics', _RAIZ / '__init__.py',
+                                                   submodule_search_locations=[str(_RAIZ)])
+    _modulo = importlib.util.module_from_spec(_spec)
+    sys.modules['pysics'] = _modulo
+    _spec.loader.exec_module(_modulo)
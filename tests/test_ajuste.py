@@ -0,0 +1,158 @@
+import numpy as np
+from pysics import ajuste
+
+
+def test_modelo_no_vectorizado():
+    # if x > 0 con un array lanza ValueError: el modelo se vectoriza con np.vectorize
+    def escalonada(x, a, b):
+        if x > 0:
+            return a*x + b
+        return b
+    x = np.linspace(-1, 2, 20)
+    y = np.where(x > 0, 3*x + 1, 1.)
+    modelo = ajuste.Modelo(escalonada)
+    a, b = ajuste.curva(modelo, x, y)
+    assert not modelo.vectorizada
+    assert np.allclose([a._medida[0], b._medida[0]], [3, 1])
+
+def test_incremental_bloque_con_ventana():
+    from pysics.objetos import Medida
+    x = np.arange(10.)
+    y = 2*x + 1 + 0.1*np.sin(x)
+    incremental = ajuste.AjusteIncremental(ventana=5).add(Medida(x, 0.1), Medida(y, 0.2)).recta()
+    directo = ajuste.minimos_pesados(Medida(x[5:], 0.1), Medida(y[5:], 0.2))
+    for a, b in ((incremental.pendiente, directo.pendiente), (incremental.n_0, directo.n_0)):
+        assert np.allclose([a._medida, a._error], [b._medida, b._error])
+
+def test_curva_xy_igual_que_recta_xy():
+    # Los dos ajustes con errores en x e y usan los errores dados como absolutos
+    from pysics.objetos import Medida
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, 20)
+    xm = Medida(x + rng.normal(0, 0.1, x.size), 0.1, aproximar=False)
+    ym = Medida(2*x + 1 + rng.normal(0, 0.3, x.size), 0.3, aproximar=False)
+    recta = ajuste.minimos_pesados_xy(xm, ym)
+    pendiente, ordenada = ajuste.curva_xy(lambda x, a, b: a*x + b, xm, ym)
+    for a, b in ((pendiente, recta.pendiente), (ordenada, recta.n_0)):
+        assert np.allclose([a._medida, a._error], [b._medida, b._error], rtol=1e-6)
+
+def _formulas_cerradas(x, y, w=None):
+    # Fórmulas directas de las sumas que se usaban antes de _Estadisticos
+    if w is None:
+        n = x.size
+        d = n*np.sum(x**2) - np.sum(x)**2
+        p = (n*np.sum(x*y) - np.sum(x)*np.sum(y))/d
+        o = (np.sum(y)*np.sum(x**2) - np.sum(x)*np.sum(x*y))/d
+        s = np.sqrt(np.sum((y - p*x - o)**2)/(n - 2))
+        return p, o, s*np.sqrt(n/d), s*np.sqrt(np.sum(x**2)/d)
+    d = np.sum(w)*np.sum(w*x**2) - np.sum(w*x)**2
+    p = (np.sum(w)*np.sum(w*x*y) - np.sum(w*x)*np.sum(w*y))/d
+    o = (np.sum(w*y)*np.sum(w*x**2) - np.sum(w*x)*np.sum(w*x*y))/d
+    return p, o, np.sqrt(np.sum(w)/d), np.sqrt(np.sum(w*x**2)/d)
+
+def test_rectas_igual_que_formulas_cerradas():
+    rng = np.random.default_rng(4)
+    for _ in range(20):
+        n = rng.integers(3, 50)
+        x = rng.uniform(-10, 10, n)
+        yerr = rng.uniform(0.1, 2, n)
+        y = rng.normal(0, 5)*x + rng.normal(0, 5) + rng.normal(0, yerr)
+        obtenido = (ajuste.pen(x, y), ajuste.n_0(x, y), ajuste.sigma_pen(x, y), ajuste.sigma_n_0(x, y))
+        assert np.allclose(obtenido, _formulas_cerradas(x, y), rtol=1e-9)
+        obtenido = (ajuste.wpen(x, y, yerr), ajuste.wn_0(x, y, yerr), ajuste.wsigma_pen(x, y, yerr),
+                    ajuste.wsigma_n_0(x, y, yerr))
+        assert np.allclose(obtenido, _formulas_cerradas(x, y, 1/yerr**2), rtol=1e-9)
+
+def test_rectas_igual_que_curve_fit():
+    from scipy.optimize import curve_fit
+    from pysics.objetos import Medida
+    rng = np.random.default_rng(5)
+    x = np.linspace(0, 10, 30)
+    yerr = rng.uniform(0.1, 1, x.size)
+    y = 3*x - 2 + rng.normal(0, yerr)
+    recta = lambda x, a, b: a*x + b
+    for obtenido, (popt, pcov) in ((ajuste.minimos_cuadrados(x, y), curve_fit(recta, x, y)),
+                                   (ajuste.minimos_pesados(x, Medida(y, yerr, aproximar=False)),
+                                    curve_fit(recta, x, y, sigma=yerr, absolute_sigma=True))):
+        assert np.allclose([obtenido.pendiente._medida[0], obtenido.n_0._medida[0]], popt, rtol=1e-6)
+        assert np.allclose([obtenido.pendiente._error[0], obtenido.n_0._error[0]], np.sqrt(np.diag(pcov)), rtol=1e-6)
+
+def test_lote_igual_que_ajustes_por_fila():
+    from pysics.objetos import Medida
+    rng = np.random.default_rng(6)
+    x = rng.uniform(0, 10, (8, 12))
+    yerr = rng.uniform(0.1, 1, x.shape)
+    y = rng.normal(0, 3, (8, 1))*x + rng.normal(0, 3, (8, 1)) + rng.normal(0, yerr)
+    # Conjuntos de distinto número de puntos (al menos 3 por fila)
+    mascara = np.arange(12) < rng.integers(3, 13, (8, 1))
+    rectas = ajuste.minimos_cuadrados_lote(x, y, mascara)
+    pesadas = ajuste.minimos_pesados_lote(x, y, yerr, mascara)
+    for i in range(8):
+        m = mascara[i]
+        for lote, fila in ((rectas[i], ajuste.minimos_cuadrados(x[i, m], y[i, m])),
+                           (pesadas[i], ajuste.minimos_pesados(x[i, m], Medida(y[i, m], yerr[i, m], aproximar=False)))):
+            for a, b in ((lote.pendiente, fila.pendiente), (lote.n_0, fila.n_0)):
+                assert np.allclose([a._medida, a._error], [b._medida, b._error], rtol=1e-9)
+        assert np.array_equal(rectas[i].x, x[i, m])
+    # Sin máscara, con la misma x para todas las filas
+    rectas = ajuste.minimos_cuadrados_lote(x[0], y)
+    for i in range(8):
+        fila = ajuste.minimos_cuadrados(x[0], y[i])
+        for a, b in ((rectas.pendiente, fila.pendiente), (rectas.n_0, fila.n_0)):
+            assert np.allclose([a._medida[i], a._error[i]], [b._medida[0], b._error[0]], rtol=1e-9)
+
+def test_base_lineal_igual_que_curve_fit():
+    from scipy.optimize import curve_fit
+    rng = np.random.default_rng(7)
+    x = np.linspace(1, 5, 40)
+    sigma = rng.uniform(0.05, 0.5, x.size)
+    y = 2*np.sin(x) - 0.5*np.log(x) + 3 + rng.normal(0, sigma)
+    funciones = [np.sin, np.log, np.ones_like]
+    modelo = lambda x, a, b, c: a*np.sin(x) + b*np.log(x) + c
+    # Sin pesos la covarianza se escala con la dispersión de los puntos, con sigma son errores absolutos
+    for pesos, absoluto in ((None, False), (sigma, True)):
+        parametros, covarianza = ajuste.minimos_cuadrados_base(x, y, funciones, sigma=pesos)
+        popt, pcov = curve_fit(modelo, x, y, sigma=pesos, absolute_sigma=absoluto)
+        assert np.allclose([p._medida[0] for p in parametros], popt, rtol=1e-6)
+        assert np.allclose(covarianza, pcov, rtol=1e-5)
+        assert np.allclose([p._error[0] for p in parametros], np.sqrt(np.diag(pcov)), rtol=1e-5)
+    # Polinomio: coeficientes de mayor a menor grado, como np.polyfit
+    parametros, covarianza = ajuste.minimos_cuadrados_base(x, y, grado=3)
+    coeficientes, cov = np.polyfit(x, y, 3, cov='unscaled')
+    assert np.allclose([p._medida[0] for p in parametros], coeficientes)
+    residuos = y - np.polyval(coeficientes, x)
+    assert np.allclose(covarianza, cov*(residuos @ residuos)/(x.size - 4))
+
+def test_resultado_ajuste_chi2_y_r2():
+    from scipy.optimize import curve_fit
+    from pysics.objetos import Medida
+    rng = np.random.default_rng(8)
+    x = np.linspace(0, 4, 25)
+    sigma = rng.uniform(0.05, 0.3, x.size)
+    y = 1.5*np.exp(-x/2) + 0.2*x + rng.normal(0, sigma)
+    modelo = lambda x, a, b, c: a*np.exp(-x/b) + c*x
+    for pesos in (None, sigma):
+        r = ajuste.curva(modelo, x, y, sigma=pesos, initial_guess=[1, 1, 0], resultado=True)
+        popt, pcov = curve_fit(modelo, x, y, p0=[1, 1, 0], sigma=pesos)
+        residuos = y - modelo(x, *popt)
+        chi2 = np.sum(residuos**2 if pesos is None else (residuos/pesos)**2)
+        r2 = 1 - np.sum(residuos**2)/np.sum((y - y.mean())**2)
+        assert np.allclose([p._medida[0] for p in r], popt) and np.allclose(r.covarianza, pcov)
+        assert np.allclose(r.residuos, residuos)
+        assert np.isclose(r.chi2, chi2) and np.isclose(r.chi2_reducido, chi2/(x.size - 3)) and np.isclose(r.r2, r2)
+    assert np.isclose(ajuste.r_curva(modelo, x, y, initial_guess=[1, 1, 0]),
+                      np.sqrt(ajuste.curva(modelo, x, y, initial_guess=[1, 1, 0], resultado=True).r2))
+
+    # Rectas: covarianza completa (con el término cruzado) igual que la de curve_fit
+    recta = lambda x, a, b: a*x + b
+    y = 2*x - 1 + rng.normal(0, sigma)
+    for r, (popt, pcov), pesos in ((ajuste.minimos_cuadrados(x, y, resultado=True), curve_fit(recta, x, y), None),
+                                   (ajuste.minimos_pesados(x, Medida(y, sigma, aproximar=False), resultado=True),
+                                    curve_fit(recta, x, y, sigma=sigma, absolute_sigma=True), sigma)):
+        residuos = y - recta(x, *popt)
+        chi2 = np.sum(residuos**2 if pesos is None else (residuos/pesos)**2)
+        assert np.allclose(r.covarianza, pcov, rtol=1e-6)
+        assert np.isclose(r.chi2, chi2) and np.isclose(r.r2, 1 - np.sum(residuos**2)/np.sum((y - y.mean())**2))
+        if pesos is None:
+            assert np.isclose(r.r2, ajuste.r_cuadrado(x, y))
+        assert r.recta.pendiente is r[0]
@@ -0,0 +1,31 @@
+import numpy as np
+from pysics import aprox, calculos
+
+
+def _parejas(n, semilla):
+    rng = np.random.default_rng(semilla)
+    valores = rng.normal(0, 1, n)*10.0**rng.integers(-8, 9, n)
+    errores = rng.uniform(1, 10, n)*10.0**rng.integers(-8, 9, n)
+    # Errores que empiezan por 1 (los que se aproximan a dos cifras) y casos especiales
+    unos = rng.random(n) < 0.3
+    errores[unos] = rng.uniform(1, 2, unos.sum())*10.0**rng.integers(-8, 9, unos.sum())
+    especiales = rng.integers(0, n, n//20)
+    errores[especiales] = rng.choice([0., np.nan, np.inf], especiales.size)
+    especiales = rng.integers(0, n, n//50)
+    valores[especiales] = rng.choice([0., np.nan, np.inf, -np.inf], especiales.size)
+    return valores, errores
+
+def test_apr_array_igual_que_apr():
+    valores, errores = _parejas(20000, 0)
+    modo_original = calculos.ROUND_MODE
+    try:
+        for modo in (calculos.ROUND_UP, calculos.ROUND_DOWN):
+            calculos.set_rounding(modo)
+            valor, error = aprox.apr_array(valores, errores)
+            referencia = np.array([aprox.apr(v, e) for v, e in zip(valores, errores)], dtype=float)
+            # Iguales bit a bit: mismos valores (nan incluidos) y mismo signo, también en los ceros
+            for resultado, esperado in ((valor, referencia[:, 0]), (error, referencia[:, 1])):
+                assert np.array_equal(resultado, esperado, equal_nan=True)
+                assert np.array_equal(np.signbit(resultado), np.signbit(esperado))
+    finally:
+        calculos.set_rounding(modo_original)
@@ -0,0 +1,45 @@
+import threading
+import numpy as np
+from pysics import cache
+
+x = np.linspace(0, 1, 5)
+TAU = 2.0
+
+def modelo(x, a):
+    return a*np.exp(-x/TAU)
+
+def auxiliar(x):
+    return x**2
+
+def compuesto(x, a):
+    return a*auxiliar(x)
+
+def _clave(funcion):
+    return cache.clave('curva', funcion, x, x)
+
+def test_clave_cambia_con_las_globales():
+    global TAU, auxiliar
+    antes = _clave(modelo)
+    assert _clave(modelo) == antes
+    TAU = 3.0
+    try:
+        assert _clave(modelo) != antes
+    finally:
+        TAU = 2.0
+    assert _clave(modelo) == antes
+
+    original = auxiliar
+    antes = _clave(compuesto)
+    auxiliar = lambda x: x**3
+    try:
+        assert _clave(compuesto) != antes
+    finally:
+        auxiliar = original
+
+CERROJO = threading.Lock()
+
+def test_global_que_no_se_puede_serializar():
+    def con_cerrojo(x, a):
+        with CERROJO:
+            return a*x
+    assert _clave(con_cerrojo) is None
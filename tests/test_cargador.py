@@ -0,0 +1,48 @@
+import numpy as np
+from pysics import cargador
+
+
+def _cargar_original(archivo, separador='\t', linea='\n', decimal=',', cabeceras=0, por_columnas=True):
+    # cargar tal y como era antes de leer por bloques
+    with open(archivo, 'rt') as file:
+        filas = [i for i in file.read().split(linea) if i.strip() != '']
+        datos = [[float(i.strip().replace(decimal, '.')) if i.strip() != '' else None for i in j.split(separador)]
+                 for j in filas[cabeceras:]]
+    if por_columnas:
+        max_len = max(len(i) for i in datos)
+        datos = [[i[index] for i in datos if index < len(i) and i[index] != None] for index in range(max_len)]
+    return datos
+
+def _archivo(tmp_path, filas, nombre='datos.txt'):
+    archivo = tmp_path/nombre
+    archivo.write_text('\n'.join(filas))
+    return str(archivo)
+
+def test_leer_igual_que_cargar_original(tmp_path):
+    rng = np.random.default_rng(9)
+    filas = ['x\ty\tz']
+    for i in range(500):
+        celdas = [f'{v:.6g}'.replace('.', ',') for v in rng.normal(0, 100, rng.integers(1, 5))]
+        # Celdas vacías y filas con distinto número de columnas, y alguna fila en blanco
+        celdas = ['' if rng.random() < 0.1 else c for c in celdas]
+        filas.append('\t'.join(celdas) if rng.random() > 0.02 else '  ')
+    archivo = _archivo(tmp_path, filas)
+    referencia = _cargar_original(archivo, cabeceras=1)
+    # Bloques pequeños para que haya filas cortadas entre bloques y bloques sin celdas vacías
+    for bloque in (7, 64, 1000, 2**24):
+        columnas = cargador.leer(archivo, cabeceras=1, bloque=bloque)
+        assert [c.tolist() for c in columnas] == referencia
+    assert cargador.cargar(archivo, cabeceras=1) == referencia
+
+    # Por filas: nan en las celdas vacías y al final de las filas cortas
+    por_filas = cargador.leer(archivo, cabeceras=1, por_columnas=False, bloque=64)
+    originales = _cargar_original(archivo, cabeceras=1, por_columnas=False)
+    assert por_filas.shape == (len(originales), max(len(f) for f in originales))
+    esperado = [[np.nan if v is None else v for v in f] + [np.nan]*(por_filas.shape[1] - len(f)) for f in originales]
+    assert np.array_equal(por_filas, esperado, equal_nan=True)
+    assert cargador.cargar(archivo, cabeceras=1, por_columnas=False) == originales
+
+def test_leer_archivos_vacios(tmp_path):
+    assert cargador.leer(_archivo(tmp_path, [])) == []
+    assert cargador.leer(_archivo(tmp_path, ['a\tb', ' '], 'cabeceras.txt'), cabeceras=1) == []
+    assert cargador.leer(_archivo(tmp_path, [], 'filas.txt'), por_columnas=False).size == 0
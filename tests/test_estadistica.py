@@ -0,0 +1,81 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pysics import estadistica
+from pysics.objetos import Medida
+
+
+def test_desviacion_movil_con_deriva():
+    # La serie se aleja mucho de su media global: las sumas acumuladas de toda la serie pierden todas las cifras
+    rng = np.random.default_rng(0)
+    t = np.arange(200000)
+    valores = 1e6*np.sin(t/2e4) + rng.normal(0, 1e-2, t.size)
+    for ventana in (5, 101):
+        resultado = estadistica.desviacion_movil(valores, ventana, estadistica.VALIDO)
+        referencia = sliding_window_view(valores, ventana).std(axis=1, ddof=1)
+        assert np.all(resultado > 0)
+        assert np.allclose(resultado, referencia, rtol=1e-6, atol=0)
+
+def test_desviacion_movil_con_escalones():
+    rng = np.random.default_rng(1)
+    t = np.arange(20000)
+    valores = np.where(t % 1000 < 500, 1e6, -1e6) + rng.normal(0, 1e-2, t.size)
+    resultado = estadistica.desviacion_movil(valores, 7, estadistica.VALIDO)
+    assert np.allclose(resultado, sliding_window_view(valores, 7).std(axis=1, ddof=1), rtol=1e-6, atol=0)
+
+def test_desviacion_movil_bordes():
+    # Todas las ventanas recortadas de modo IGUAL, con series que no son múltiplo de la ventana
+    rng = np.random.default_rng(2)
+    for n in range(12):
+        valores = rng.normal(size=n)
+        for ventana in range(1, 15):
+            for modo in (estadistica.IGUAL, estadistica.VALIDO):
+                inicio, fin = estadistica._limites_ventanas(n, ventana, modo)
+                referencia = [np.std(valores[a:b], ddof=1) if b - a > 1 else np.nan for a, b in zip(inicio, fin)]
+                resultado = estadistica.desviacion_movil(valores, ventana, modo)
+                assert np.allclose(resultado, referencia, equal_nan=True)
+
+def test_sumas_moviles_con_valores_grandes_al_principio():
+    # Unos pocos errores grandes al principio: las sumas acumuladas de toda la serie borran los pequeños de después
+    errores = np.full(1000, 1e-3)
+    errores[:10] = 1e5
+    media = estadistica.media_movil(Medida(np.zeros(1000), errores, aproximar=False), 5, estadistica.VALIDO)
+    assert np.allclose(media._error[10:], np.sqrt(5e-6)/5)
+    suma = estadistica.suma_movil(Medida(np.zeros(1000), errores, aproximar=False), 5, estadistica.VALIDO)
+    assert np.allclose(suma._error[10:], np.sqrt(5e-6))
+
+    errores = np.ones(1000)
+    errores[:10] = 1e-8
+    pesada = estadistica.media_pesada_movil(Medida(np.arange(1000.), errores, aproximar=False), 5,
+                                            estadistica.VALIDO)
+    assert np.allclose(pesada._medida[10:], np.arange(12., 998.))
+    assert np.allclose(pesada._error[10:], 1/np.sqrt(5))
+
+def test_sumas_moviles_bordes():
+    rng = np.random.default_rng(3)
+    for n in range(12):
+        valores, errores = rng.normal(size=n), rng.uniform(0.1, 1, n)
+        medida = Medida(valores, errores, aproximar=False)
+        for ventana in range(1, 15):
+            for modo in (estadistica.IGUAL, estadistica.VALIDO):
+                inicio, fin = estadistica._limites_ventanas(n, ventana, modo)
+                media = estadistica.media_movil(medida, ventana, modo)
+                pesada = estadistica.media_pesada_movil(medida, ventana, modo)
+                for i, (a, b) in enumerate(zip(inicio, fin)):
+                    pesos = errores[a:b]**-2
+                    assert np.isclose(media._medida[i], valores[a:b].mean())
+                    assert np.isclose(media._error[i], np.sqrt(np.sum(errores[a:b]**2))/(b - a))
+                    assert np.isclose(pesada._medida[i], np.average(valores[a:b], weights=pesos))
+                    assert np.isclose(pesada._error[i], 1/np.sqrt(pesos.sum()))
+
+def test_estimacion_de_un_solo_valor():
+    from pysics import calculos
+    for backend in (calculos.FLOAT64, calculos.MULTIPRECISION):
+        medida = Medida([5.], 0.1, aproximar=False, backend=backend).estimacion()
+        assert np.allclose(medida._medida.astype(float), [5.]) and np.allclose(medida._error.astype(float), [0.1])
+        assert np.isnan(Medida([5.], 0.1, backend=backend).desviacion_estandar())
+
+def test_agrupa_grupos_de_un_valor():
+    claves, medias, cuentas = Medida([1., 2., 3., 4.], 0.1, aproximar=False).agrupa([0, 0, 1, 2], pesado=False)
+    assert np.array_equal(claves, [0, 1, 2]) and np.array_equal(cuentas, [2, 1, 1])
+    assert np.allclose(medias._medida, [1.5, 3., 4.])
+    assert np.allclose(medias._error, [0.5, 0.1, 0.1])
@@ -0,0 +1,46 @@
+import numpy as np
+from pysics.objetos import Medida
+
+
+def _medida():
+    return Medida([0.3, 2.0, -1.5], [0.1, 0.2, 0.05], aproximar=False)
+
+def test_misma_medida_sin_error():
+    # Si una medida aparece varias veces sus derivadas se suman con signo y se cancelan
+    x = _medida()
+    p = x.perezosa()
+    for expresion in (p/x, -p + x, p - x, np.cos(p) - np.cos(p), np.sin(p)**2 + np.cos(p)**2,
+                      np.arccos(p/10) + np.arcsin(p/10), np.arctan2(p, 1) - np.arctan(p)):
+        resultado = expresion.evalua()
+        assert np.allclose(resultado._error, 0, atol=1e-12)
+
+def test_cociente_y_cuadrado():
+    x = _medida()
+    p = x.perezosa()
+    assert np.allclose((p*x).evalua()._error, 2*np.abs(x._medida)*x._error)
+    assert np.allclose((1/p).evalua()._error, x._error/x._medida**2)
+
+def test_igual_que_sin_perezosa():
+    # Con medidas distintas el resultado es el mismo que operando normalmente
+    x, y = _medida(), Medida([1.2, 0.7, 3.1], 0.05, aproximar=False)
+    normal = x*y - x.copy()/y
+    perezosa = (x.perezosa()*y - x.copy()/y).evalua()
+    assert np.allclose(perezosa._medida, normal._medida)
+    assert np.allclose(perezosa._error, normal._error)
+
+def test_expresion_sin_medidas():
+    from pysics.expresion import Expresion
+    resultado = (Expresion(np.array([1., 2.]))*3 + 1).evalua()
+    assert np.array_equal(resultado._medida, [4., 7.])
+    assert np.array_equal(resultado._error, [0., 0.])
+
+def test_ejemplo_del_readme():
+    from pysics import calculos, pi
+    x = Medida(2, 0.1)
+    assert np.allclose((x*x).error, [np.sqrt(2)*2*0.1])
+    assert np.allclose((x.perezosa()*x).evalua().error, [0.4])
+    L = Medida([0.5, 0.75, 1.0], 0.001)
+    T = Medida([1.42, 1.74, 2.01], 0.01)
+    g = (4*pi**2*L.perezosa()/T**2).evalua()
+    assert g.backend == calculos.FLOAT64
+    assert np.allclose(g._medida, 4*np.pi**2*L._medida/T._medida**2)
@@ -0,0 +1,13 @@
+import mpmath
+import numpy as np
+from pysics import calculos, func
+from pysics.objetos import Medida
+
+
+def test_atan2_precision_multiple():
+    x = Medida([1, 2], 0.1, aproximar=False, backend=calculos.MULTIPRECISION)
+    y = Medida([3, 1], 0.2, aproximar=False, backend=calculos.MULTIPRECISION)
+    angulos = func.atan2(x, y)
+    assert angulos.backend == calculos.MULTIPRECISION
+    assert abs(angulos._medida[0].value - mpmath.atan2(1, 3)) < mpmath.mpf(2)**(-mpmath.mp.prec + 1)
+    assert np.allclose(func.atan2(x.copy().cambia_backend(calculos.FLOAT64), [3., 1.])._medida, np.arctan2([1, 2], [3, 1]))
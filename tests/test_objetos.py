@@ -0,0 +1,44 @@
+import numpy as np
+from pysics.objetos import Medida
+
+
+def test_entero_es_copia():
+    m = Medida([1., 2., 3.], 0.1, aproximar=False)
+    total = m[0]
+    total += m[1]
+    assert np.array_equal(m._medida, [1., 2., 3.])
+    assert np.allclose(total._medida, [3.])
+    fila = Medida(np.arange(6.).reshape(2, 3), 0.1, aproximar=False)[0]
+    fila *= 2
+    assert np.array_equal(fila._medida, [0., 2., 4.])
+
+def test_slice_es_vista():
+    m = Medida([1., 2., 3.], 0.1, aproximar=False)
+    resto = m[1:]
+    resto += 1
+    assert np.array_equal(m._medida, [1., 3., 4.])
+
+def test_funciones_de_numpy():
+    m = Medida([-1., 0., 3.], [0.1, 0.2, 0.3], aproximar=False)
+    # Las funciones sin implementación para medidas se aplican a los valores, como antes de __array_function__
+    assert np.max(m) == 3 and np.min(m) == -1
+    assert np.shape(m) == (3, )
+    unidas = np.concatenate([m, m])
+    assert np.array_equal(unidas._medida, [-1., 0., 3.]*2)
+    assert np.array_equal(unidas._error, [0.1, 0.2, 0.3]*2)
+    assert np.stack([m, m]).shape == (2, 3)
+    absoluto = np.abs(m)
+    assert np.array_equal(absoluto._medida, [1., 0., 3.])
+    assert np.array_equal(absoluto._error, abs(m)._error)
+
+def test_constante_mpmath_no_cambia_el_backend():
+    from pysics import calculos, pi
+    m = Medida(np.linspace(0, 1, 1000), 0.01, aproximar=False)
+    for factor, resultado in ((2, 2*pi*m), (1, m*pi), (1, (pi*m.perezosa()).evalua())):
+        assert resultado.backend == calculos.FLOAT64
+        assert np.allclose(resultado._medida, factor*np.pi*m._medida)
+    en_el_sitio = m.copy()
+    en_el_sitio *= pi
+    assert en_el_sitio._medida.dtype == float
+    multiple = Medida([1., 2.], 0.1, aproximar=False, backend=calculos.MULTIPRECISION)
+    assert (pi*multiple).backend == calculos.MULTIPRECISION